@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Video to Audio Converter - Banc d'essai
+---------------------------------------
+Génère un corpus synthétique et déterministe avec les sources lavfi de
+FFmpeg (mire testsrc et tonalité sine), puis mesure le débit de
+convert_video_to_audio() et de batch_convert() pour plusieurs formats,
+qualités et nombres de conversions simultanées.
+
+Le rapport JSON donne, pour chaque scénario, les fichiers par seconde, les
+secondes d'audio par seconde, le facteur temps réel par conversion,
+l'utilisation CPU et la mémoire maximale d'un processus FFmpeg.
+"""
+
+import os
+import sys
+import argparse
+import json
+import logging
+import resource
+import shutil
+import subprocess
+import tempfile
+import time
+from collections import namedtuple
+
+import video2audio
+
+logger = logging.getLogger(__name__)
+
+# Une vidéo du corpus: conteneur, codecs vidéo et audio
+CorpusFormat = namedtuple('CorpusFormat', ['container', 'video_codec', 'audio_codec'])
+
+# Conteneurs et codecs courants; ceux dont l'encodeur manque sont sautés
+CORPUS_FORMATS = (
+    CorpusFormat('mp4', 'mpeg4', 'aac'),
+    CorpusFormat('mp4', 'libx264', 'aac'),
+    CorpusFormat('mkv', 'mpeg4', 'libopus'),
+    CorpusFormat('mkv', 'mpeg4', 'flac'),
+    CorpusFormat('mov', 'mpeg4', 'alac'),
+    CorpusFormat('webm', 'libvpx', 'libvorbis'),
+    CorpusFormat('avi', 'mpeg4', 'libmp3lame'),
+    CorpusFormat('avi', 'mpeg4', 'ac3')
+)
+
+DEFAULT_DURATIONS = (5, 30)
+DEFAULT_FORMATS = ('mp3', 'wav', 'auto')
+DEFAULT_QUALITIES = ('128k', '320k')
+
+def default_corpus_dir():
+    """Emplacement par défaut du corpus, réutilisé d'une exécution à l'autre."""
+    return os.path.join(tempfile.gettempdir(), 'video2audio-bench')
+
+def build_corpus_cmd(path, corpus_format, duration, frequency):
+    """
+    Construit la commande FFmpeg qui génère une vidéo du corpus.
+    
+    Les drapeaux bitexact rendent le fichier identique d'une machine à
+    l'autre pour une même version de FFmpeg.
+    
+    Args:
+        path (str): Fichier à créer
+        corpus_format (CorpusFormat): Conteneur et codecs
+        duration (int): Durée en secondes
+        frequency (int): Fréquence de la tonalité, en Hz
+    
+    Returns:
+        list: Arguments de la commande FFmpeg
+    """
+    return [
+        "ffmpeg", "-hide_banner", "-loglevel", "error", "-y",
+        "-f", "lavfi", "-i", f"testsrc=size=320x240:rate=25:duration={duration}",
+        "-f", "lavfi", "-i", f"sine=frequency={frequency}:sample_rate=48000:duration={duration}",
+        "-ac", "2",
+        "-c:v", corpus_format.video_codec,
+        "-c:a", corpus_format.audio_codec,
+        "-fflags", "+bitexact", "-flags:v", "+bitexact", "-flags:a", "+bitexact",
+        "-map_metadata", "-1",
+        "-shortest",
+        path
+    ]
+
+def generate_corpus(corpus_dir, durations=DEFAULT_DURATIONS):
+    """
+    Génère le corpus s'il n'existe pas déjà.
+    
+    Args:
+        corpus_dir (str): Dossier du corpus
+        durations (iterable): Durées des vidéos, en secondes
+    
+    Returns:
+        list: Couples (chemin, durée) des vidéos du corpus
+    """
+    capabilities = video2audio.get_ffmpeg_capabilities()
+    os.makedirs(corpus_dir, exist_ok=True)
+    
+    corpus = []
+    for number, corpus_format in enumerate(CORPUS_FORMATS):
+        missing = {corpus_format.video_codec, corpus_format.audio_codec} - capabilities.encoders
+        if missing:
+            logger.warning(f"Encodeurs absents, format sauté: {', '.join(sorted(missing))}")
+            continue
+        
+        for duration in durations:
+            name = f"{corpus_format.video_codec}-{corpus_format.audio_codec}-{duration}s.{corpus_format.container}"
+            path = os.path.join(corpus_dir, name)
+            if not os.path.exists(path):
+                logger.info(f"Génération de {name}")
+                # Écriture dans un sous-dossier temporaire: une génération
+                # interrompue ne laisse pas de fichier tronqué dans le corpus
+                tmp_path = os.path.join(corpus_dir, '.partial', name)
+                os.makedirs(os.path.dirname(tmp_path), exist_ok=True)
+                subprocess.run(
+                    build_corpus_cmd(tmp_path, corpus_format, duration, 220 + 110 * number),
+                    stdin=subprocess.DEVNULL,
+                    check=True
+                )
+                os.replace(tmp_path, path)
+            corpus.append((path, duration))
+    
+    return corpus
+
+def link_corpus(corpus, directory):
+    """
+    Réunit dans un dossier les seules vidéos du corpus de cette exécution.
+    
+    Le dossier du corpus est réutilisé d'une exécution à l'autre et peut
+    contenir des vidéos d'autres durées: le mode batch, qui convertit tout
+    un dossier, ne doit voir que celles qui sont mesurées.
+    
+    Args:
+        corpus (list): Couples (chemin, durée) des vidéos du corpus
+        directory (str): Dossier à créer, qui reçoit un lien par vidéo
+    
+    Returns:
+        str: Chemin du dossier
+    """
+    os.makedirs(directory)
+    for path, _ in corpus:
+        link = os.path.join(directory, os.path.basename(path))
+        try:
+            os.symlink(os.path.abspath(path), link)
+        except OSError:
+            # Liens symboliques indisponibles (Windows sans privilège)
+            shutil.copyfile(path, link)
+    return directory
+
+def measure(run):
+    """
+    Exécute `run` et mesure son coût, processus FFmpeg compris.
+    
+    Args:
+        run (callable): Scénario à mesurer, qui retourne le nombre d'échecs
+    
+    Returns:
+        dict: Durée, temps CPU, utilisation CPU, mémoire maximale et échecs
+    """
+    self_before = resource.getrusage(resource.RUSAGE_SELF)
+    children_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    started = time.monotonic()
+    
+    failures = run()
+    
+    wall = time.monotonic() - started
+    self_after = resource.getrusage(resource.RUSAGE_SELF)
+    children_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    
+    cpu = sum(
+        after - before
+        for before, after in (
+            (self_before.ru_utime, self_after.ru_utime),
+            (self_before.ru_stime, self_after.ru_stime),
+            (children_before.ru_utime, children_after.ru_utime),
+            (children_before.ru_stime, children_after.ru_stime)
+        )
+    )
+    return {
+        'wall_seconds': round(wall, 3),
+        'cpu_seconds': round(cpu, 3),
+        'cpu_utilisation': round(cpu / (wall * (os.cpu_count() or 1)), 3) if wall else None,
+        # ru_maxrss est en Kio sous Linux; pour les enfants, c'est le
+        # maximum atteint par un seul processus depuis le début du banc
+        'peak_child_rss_mb': round(children_after.ru_maxrss / 1024, 1),
+        'peak_self_rss_mb': round(self_after.ru_maxrss / 1024, 1),
+        'failures': failures
+    }
+
+def run_single(corpus, output_dir, audio_format, quality):
+    """Convertit le corpus fichier par fichier avec convert_video_to_audio()."""
+    failures = 0
+    for path, _ in corpus:
+        output_path = os.path.join(output_dir, os.path.splitext(os.path.basename(path))[0] + f".{audio_format}")
+        if not video2audio.convert_video_to_audio(path, output_path, audio_format, quality):
+            failures += 1
+    return failures
+
+def run_batch(batch_dir, output_dir, audio_format, quality, jobs):
+    """Convertit le corpus, réuni par link_corpus(), avec batch_convert()."""
+    _, failures = video2audio.batch_convert(batch_dir, output_dir, audio_format, quality, jobs=jobs)
+    return failures
+
+def scenario_report(mode, audio_format, quality, jobs, corpus, measures):
+    """Ajoute aux mesures brutes les débits d'un scénario."""
+    audio_seconds = sum(duration for _, duration in corpus)
+    wall = measures['wall_seconds']
+    report = {
+        'mode': mode,
+        'format': audio_format,
+        'quality': quality if audio_format == 'mp3' else None,
+        'jobs': jobs,
+        'files': len(corpus),
+        'audio_seconds': audio_seconds,
+        'files_per_second': round(len(corpus) / wall, 3) if wall else None,
+        'audio_seconds_per_second': round(audio_seconds / wall, 3) if wall else None,
+        # Vitesse de chaque conversion par rapport au temps réel
+        'realtime_factor': round(audio_seconds / wall / jobs, 3) if wall else None
+    }
+    report.update(measures)
+    return report
+
+def run_bench(corpus_dir, durations, formats, qualities, job_counts):
+    """
+    Génère le corpus puis mesure chaque scénario.
+    
+    Args:
+        corpus_dir (str): Dossier du corpus
+        durations (iterable): Durées des vidéos, en secondes
+        formats (iterable): Formats de sortie à mesurer
+        qualities (iterable): Qualités à mesurer (mp3 seulement)
+        job_counts (iterable): Nombres de conversions simultanées pour batch_convert()
+    
+    Returns:
+        dict: Rapport complet, sérialisable en JSON
+    """
+    corpus = generate_corpus(corpus_dir, durations)
+    capabilities = video2audio.get_ffmpeg_capabilities()
+    
+    results = []
+    output_root = tempfile.mkdtemp(prefix='video2audio-bench-out-')
+    try:
+        batch_dir = link_corpus(corpus, os.path.join(output_root, 'corpus'))
+        for audio_format in formats:
+            # La qualité n'influence que l'encodage mp3
+            for quality in (qualities if audio_format == 'mp3' else qualities[:1]):
+                output_dir = os.path.join(output_root, 'single')
+                measures = measure(lambda: run_single(corpus, output_dir, audio_format, quality))
+                results.append(scenario_report('single', audio_format, quality, 1, corpus, measures))
+                shutil.rmtree(output_dir, ignore_errors=True)
+                
+                for jobs in job_counts:
+                    output_dir = os.path.join(output_root, 'batch')
+                    measures = measure(lambda: run_batch(batch_dir, output_dir, audio_format, quality, jobs))
+                    results.append(scenario_report('batch', audio_format, quality, jobs, corpus, measures))
+                    shutil.rmtree(output_dir, ignore_errors=True)
+                
+                logger.info(f"Mesuré: {audio_format} {quality}")
+    finally:
+        shutil.rmtree(output_root, ignore_errors=True)
+    
+    return {
+        'ffmpeg_version': capabilities.version,
+        'cpu_count': os.cpu_count(),
+        'corpus': [
+            {'file': os.path.basename(path), 'duration': duration, 'size': os.path.getsize(path)}
+            for path, duration in corpus
+        ],
+        'results': results
+    }
+
+def parse_arguments():
+    """Parse les arguments de ligne de commande."""
+    parser = argparse.ArgumentParser(
+        description="Banc d'essai du convertisseur vidéo en audio.",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter
+    )
+    
+    parser.add_argument(
+        "--corpus",
+        default=default_corpus_dir(),
+        help="Dossier du corpus synthétique (généré s'il n'existe pas)"
+    )
+    
+    parser.add_argument(
+        "--durations",
+        type=int,
+        nargs="+",
+        default=list(DEFAULT_DURATIONS),
+        help="Durées des vidéos du corpus, en secondes"
+    )
+    
+    parser.add_argument(
+        "-f", "--formats",
+        nargs="+",
+        choices=video2audio.AUDIO_FORMATS,
+        default=list(DEFAULT_FORMATS),
+        help="Formats de sortie à mesurer"
+    )
+    
+    parser.add_argument(
+        "-q", "--qualities",
+        nargs="+",
+        choices=video2audio.AUDIO_QUALITIES,
+        default=list(DEFAULT_QUALITIES),
+        help="Qualités mp3 à mesurer"
+    )
+    
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        nargs="+",
+        default=sorted({1, video2audio.default_jobs()}),
+        help="Nombres de conversions simultanées à mesurer en mode batch"
+    )
+    
+    parser.add_argument(
+        "-o", "--output",
+        help="Fichier du rapport JSON (défaut: sortie standard)"
+    )
+    
+    return parser.parse_args()
+
+def main():
+    """Fonction principale du banc d'essai."""
+    args = parse_arguments()
+    
+    if not video2audio.check_ffmpeg(args.formats):
+        sys.exit(1)
+    
+    if any(jobs < 1 for jobs in args.jobs):
+        logger.error(f"Le nombre de conversions simultanées doit être au moins 1: {args.jobs}")
+        sys.exit(1)
+    
+    # Les messages de chaque conversion fausseraient les mesures
+    video2audio.logger.setLevel(logging.WARNING)
+    logger.setLevel(logging.INFO)
+    
+    report = run_bench(args.corpus, args.durations, args.formats, args.qualities, args.jobs)
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        logger.info(f"Rapport enregistré dans {args.output}")
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+
+if __name__ == "__main__":
+    main()
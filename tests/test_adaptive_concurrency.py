@@ -0,0 +1,91 @@
+import pytest
+
+import video2audio
+
+
+class FakeTracker:
+    """Avancement simulé: secondes d'audio produites, alimentées par le test."""
+
+    def __init__(self):
+        self.total = 0.0
+
+    def processed(self):
+        return self.total
+
+
+@pytest.fixture
+def machine(monkeypatch):
+    """Horloge, charge et iowait simulés pour AdaptiveConcurrency.tick()."""
+    state = {'clock': 1000.0, 'load': 0.5, 'iowait': 0.0, 'cpu': (0, 0)}
+
+    def cpu_times():
+        iowait, total = state['cpu']
+        state['cpu'] = (iowait + round(100 * state['iowait']), total + 100)
+        return state['cpu']
+
+    monkeypatch.setattr(video2audio.time, 'monotonic', lambda: state['clock'])
+    monkeypatch.setattr(video2audio, 'load_per_cpu', lambda: state['load'])
+    monkeypatch.setattr(video2audio, 'read_cpu_times', cpu_times)
+    return state
+
+
+def simulate(machine, limit, max_jobs, periods, knee, load=None, iowait=None):
+    """
+    Fait tourner le contrôleur sur un lot dont le débit croît avec la
+    limite jusqu'au point optimal `knee`, puis plafonne.
+
+    Returns:
+        list: Limite à la fin de chaque période
+    """
+    limiter = video2audio.ConcurrencyLimit(limit)
+    tracker = FakeTracker()
+    controller = video2audio.AdaptiveConcurrency(limiter, tracker, max_jobs, interval=10.0)
+
+    history = []
+    for period in range(periods):
+        machine['load'] = load(period) if load else 0.5
+        machine['iowait'] = iowait(period) if iowait else 0.0
+        current_knee = knee(period) if callable(knee) else knee
+        tracker.total += 10.0 * min(limiter.limit, current_knee) * controller.interval
+        machine['clock'] += controller.interval
+        controller.tick()
+        history.append(limiter.limit)
+    return history
+
+
+def test_climbs_to_the_knee(machine):
+    history = simulate(machine, limit=2, max_jobs=32, periods=30, knee=8)
+    assert max(history) <= 9
+    assert history[-1] in (8, 9)
+
+
+def test_single_load_spike_recovers(machine):
+    history = simulate(
+        machine, limit=8, max_jobs=16, periods=60, knee=8,
+        load=lambda period: 5.0 if period == 10 else 0.5
+    )
+    # Un seul recul, pas d'effondrement en cascade jusqu'à 1
+    assert history[10] == 4
+    assert min(history[10:]) == 4
+    assert history[-1] in (8, 9)
+
+
+def test_follows_a_moving_knee(machine):
+    history = simulate(
+        machine, limit=8, max_jobs=32, periods=80, knee=lambda period: 8 if period < 20 else 14
+    )
+    assert history[19] in (8, 9)
+    assert history[-1] in (14, 15)
+
+
+def test_backs_off_on_iowait(machine):
+    history = simulate(
+        machine, limit=8, max_jobs=16, periods=3, knee=16,
+        iowait=lambda period: 0.5 if period == 1 else 0.0
+    )
+    assert history[1] == 4
+
+
+def test_never_exceeds_max_jobs(machine):
+    history = simulate(machine, limit=1, max_jobs=4, periods=30, knee=32)
+    assert max(history) == 4
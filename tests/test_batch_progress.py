@@ -0,0 +1,40 @@
+import video2audio
+
+
+def job(name, duration=60.0):
+    return video2audio.BatchJob(name, [video2audio.OutputSpec(name + ".mp3", 'mp3', '192k')], None, duration)
+
+
+def test_fast_failure_is_not_counted_as_processed_audio():
+    tracker = video2audio.BatchProgress()
+    failed = job("corrupt.mp4")
+    tracker.planned(failed)
+
+    tracker.finished(failed, converted=False)
+
+    assert tracker.processed() == 0.0
+    status = tracker.snapshot()
+    assert status.speed is None
+    # La vidéo n'est plus à convertir pour autant
+    assert status.audio_done == 60.0
+
+
+def test_failure_keeps_the_last_reported_position():
+    tracker = video2audio.BatchProgress()
+    failed = job("truncated.mp4")
+    tracker.planned(failed)
+    tracker.update(failed, video2audio.Progress(12.0, None, None, False))
+
+    tracker.finished(failed, converted=False)
+
+    assert tracker.processed() == 12.0
+
+
+def test_success_without_progress_counts_the_whole_video():
+    tracker = video2audio.BatchProgress()
+    grouped = job("clip.mp4", duration=2.0)
+    tracker.planned(grouped)
+
+    tracker.finished(grouped, converted=True)
+
+    assert tracker.processed() == 2.0
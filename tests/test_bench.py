@@ -0,0 +1,20 @@
+import os
+
+import bench_video2audio
+import video2audio
+
+
+def test_link_corpus_contains_only_the_current_corpus(tmp_path):
+    corpus_dir = tmp_path / "corpus"
+    corpus_dir.mkdir()
+    # Vidéo d'une exécution précédente, avec une autre durée
+    (corpus_dir / "mpeg4-aac-5s.mp4").write_bytes(b'old')
+    current = corpus_dir / "mpeg4-aac-60s.mp4"
+    current.write_bytes(b'new')
+
+    batch_dir = bench_video2audio.link_corpus([(str(current), 60)], str(tmp_path / "run" / "corpus"))
+
+    videos = list(video2audio.find_video_files(batch_dir))
+    assert [os.path.basename(video) for video in videos] == ["mpeg4-aac-60s.mp4"]
+    with open(videos[0], 'rb') as f:
+        assert f.read() == b'new'
@@ -0,0 +1,76 @@
+import os
+import shutil
+import stat
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+import video2audio
+
+# FFmpeg simulé: comme le vrai, il n'écrit la ligne time= sous le niveau
+# info que si -stats est demandé
+FAKE_FFMPEG = textwrap.dedent('''\
+    #!{python}
+    import sys
+    args = sys.argv[1:]
+    quiet = '-loglevel' in args and args[args.index('-loglevel') + 1] in ('quiet', 'panic', 'fatal', 'error', 'warning')
+    if '-stats' in args or not quiet:
+        sys.stderr.write("size=      98kB time=00:00:12.50 bitrate= 64.2kbits/s speed=80x\\r\\n")
+    if 'broken' in args[args.index('-i') + 1]:
+        sys.stderr.write("Invalid data found when processing input\\n")
+        sys.exit(1)
+    with open(args[-1], 'wb') as f:
+        f.write(b'x' * 100)
+''')
+
+
+@pytest.fixture
+def fake_ffmpeg(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    ffmpeg = bin_dir / "ffmpeg"
+    ffmpeg.write_text(FAKE_FFMPEG.format(python=sys.executable))
+    ffmpeg.chmod(ffmpeg.stat().st_mode | stat.S_IXUSR)
+    monkeypatch.setenv('PATH', f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    return ffmpeg
+
+
+def test_convert_reports_audio_seconds(tmp_path, fake_ffmpeg):
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b'v' * 1000)
+
+    converter = video2audio.Converter('mp3', '192k')
+    converter._ffmpeg_available = True
+    result = converter.convert(str(video), str(tmp_path / "out" / "audio.mp3"))
+
+    assert result.ok
+    assert result.audio_seconds == pytest.approx(12.5)
+    assert result.realtime_factor is not None
+
+
+def test_failure_log_names_the_input(tmp_path, fake_ffmpeg, caplog):
+    video = tmp_path / "broken.mp4"
+    video.write_bytes(b'v' * 1000)
+
+    assert not video2audio.convert_video_to_audio(str(video), str(tmp_path / "out" / "audio.mp3"), 'mp3')
+
+    errors = [record.getMessage() for record in caplog.records if record.levelname == 'ERROR']
+    assert any(str(video) in message and "code 1" in message for message in errors)
+    assert any("Invalid data found" in message for message in errors)
+
+
+@pytest.mark.skipif(shutil.which('ffmpeg') is None, reason="FFmpeg absent")
+def test_convert_reports_audio_seconds_with_ffmpeg(tmp_path):
+    video = tmp_path / "video.mkv"
+    subprocess.run(
+        ["ffmpeg", "-hide_banner", "-loglevel", "error", "-f", "lavfi", "-i", "sine=duration=3",
+         "-c:a", "pcm_s16le", str(video)],
+        check=True
+    )
+
+    result = video2audio.Converter('wav').convert(str(video), str(tmp_path / "audio.wav"))
+
+    assert result.ok
+    assert result.audio_seconds == pytest.approx(3.0, abs=0.1)
@@ -0,0 +1,151 @@
+import asyncio
+import json
+import os
+import shutil
+import stat
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+import video2audio
+
+# FFmpeg simulé qui refuse toute copie de piste après avoir commencé la
+# sortie, comme le vrai quand l'en-tête du conteneur est refusé
+FAKE_FFMPEG = textwrap.dedent('''\
+    #!{python}
+    import json, os, sys
+    args = sys.argv[1:]
+    with open({log!r}, 'a') as f:
+        f.write(json.dumps(args) + "\\n")
+    if '-y' not in args and os.path.exists(args[-1]):
+        sys.exit(1)
+    with open(args[-1], 'wb') as f:
+        f.write(b'x' * 100)
+    if args[args.index('-c:a') + 1] == 'copy':
+        sys.stderr.write("Could not write header (incorrect codec parameters ?)\\n")
+        sys.exit(1)
+''')
+
+
+def media_info(codec):
+    return video2audio.MediaInfo(
+        'mov,mp4,m4a,3gp,3g2,mj2', 60.0, None,
+        (video2audio.AudioStream(1, codec, 2, 48000, None, None, None, True),)
+    )
+
+
+@pytest.mark.parametrize('codec, container', [
+    ('pcm_s16le', 'wav'),
+    ('pcm_s24le', 'wav'),
+    ('pcm_f32le', 'wav'),
+    ('pcm_s16be', 'aiff'),
+    ('pcm_s24be', 'aiff'),
+])
+def test_pcm_tracks_are_copied(codec, container):
+    assert video2audio.resolve_audio_format("camera.mov", 'auto', media_info(codec)) == ('copy', container)
+
+
+@pytest.fixture
+def refusing_ffmpeg(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    log = tmp_path / "ffmpeg.log"
+    ffmpeg = bin_dir / "ffmpeg"
+    ffmpeg.write_text(FAKE_FFMPEG.format(python=sys.executable, log=str(log)))
+    ffmpeg.chmod(ffmpeg.stat().st_mode | stat.S_IXUSR)
+    monkeypatch.setenv('PATH', f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    return lambda: [json.loads(line) for line in log.read_text().splitlines()]
+
+
+def test_failed_copy_falls_back_to_encoding(tmp_path, monkeypatch, refusing_ffmpeg):
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b'v' * 1000)
+    monkeypatch.setattr(video2audio, 'probe_media', lambda path: media_info('aac'))
+
+    assert video2audio.convert_video_to_audio(str(video), str(tmp_path / "out" / "audio.mp3"), 'auto', '192k')
+
+    copy_cmd, encode_cmd = refusing_ffmpeg()
+    assert copy_cmd[copy_cmd.index('-c:a') + 1] == 'copy'
+    # Même fichier de sortie, encodé dans le conteneur choisi pour la copie
+    assert encode_cmd[-1] == copy_cmd[-1] == str(tmp_path / "out" / "audio.m4a")
+    assert encode_cmd[encode_cmd.index('-c:a') + 1] == 'aac'
+    assert encode_cmd[encode_cmd.index('-b:a') + 1] == '192k'
+    assert (tmp_path / "out" / "audio.m4a").exists()
+
+
+def test_failed_pcm_copy_stays_lossless(tmp_path, monkeypatch, refusing_ffmpeg):
+    video = tmp_path / "camera.mov"
+    video.write_bytes(b'v' * 1000)
+    monkeypatch.setattr(video2audio, 'probe_media', lambda path: media_info('pcm_s24le'))
+
+    assert video2audio.convert_video_to_audio(str(video), str(tmp_path / "camera.mp3"), 'auto')
+
+    _, encode_cmd = refusing_ffmpeg()
+    assert encode_cmd[-1] == str(tmp_path / "camera.wav")
+    assert encode_cmd[encode_cmd.index('-c:a') + 1] == 'pcm_s16le'
+    assert '-b:a' not in encode_cmd
+
+
+def test_async_copy_falls_back_to_encoding(tmp_path, monkeypatch, refusing_ffmpeg):
+    video = tmp_path / "video.mkv"
+    video.write_bytes(b'v' * 1000)
+
+    async def resolve(input_path, audio_format):
+        return 'copy', 'opus'
+
+    monkeypatch.setattr(video2audio, 'resolve_audio_format_async', resolve)
+
+    assert asyncio.run(video2audio.convert_async(str(video), str(tmp_path / "audio.mp3"), 'auto'))
+
+    _, encode_cmd = refusing_ffmpeg()
+    assert encode_cmd[-1] == str(tmp_path / "audio.opus")
+    assert encode_cmd[encode_cmd.index('-c:a') + 1] == 'libopus'
+
+
+def test_converter_copy_falls_back_to_encoding(tmp_path, monkeypatch, refusing_ffmpeg):
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b'v' * 1000)
+    monkeypatch.setattr(video2audio, 'probe_media', lambda path: media_info('aac'))
+
+    converter = video2audio.Converter('auto', '192k')
+    converter._ffmpeg_available = True
+    result = converter.convert(str(video), str(tmp_path / "audio.mp3"))
+
+    assert result.ok
+    assert result.output_path == str(tmp_path / "audio.m4a")
+    assert [cmd[cmd.index('-c:a') + 1] for cmd in refusing_ffmpeg()] == ['copy', 'aac']
+
+
+def test_encoding_failure_is_not_retried(tmp_path, refusing_ffmpeg):
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b'v' * 1000)
+    (tmp_path / "audio.mp3").write_bytes(b'existant')
+
+    assert not video2audio.convert_video_to_audio(str(video), str(tmp_path / "audio.mp3"), 'mp3')
+
+    assert len(refusing_ffmpeg()) == 1
+    # Une sortie présente avant la conversion n'est jamais supprimée
+    assert (tmp_path / "audio.mp3").read_bytes() == b'existant'
+
+
+@pytest.mark.skipif(shutil.which('ffmpeg') is None, reason="FFmpeg absent")
+def test_big_endian_pcm_is_extracted_losslessly(tmp_path, monkeypatch):
+    video = tmp_path / "camera.mov"
+    subprocess.run(
+        ["ffmpeg", "-hide_banner", "-loglevel", "error", "-f", "lavfi", "-i", "sine=duration=2",
+         "-c:a", "pcm_s24be", str(video)],
+        check=True
+    )
+    monkeypatch.setattr(video2audio, 'probe_media', lambda path: media_info('pcm_s24be'))
+
+    assert video2audio.convert_video_to_audio(str(video), str(tmp_path / "camera.mp3"), 'auto')
+
+    def decode(path):
+        return subprocess.run(
+            ["ffmpeg", "-hide_banner", "-loglevel", "error", "-i", str(path), "-f", "s32le", "-"],
+            check=True, capture_output=True
+        ).stdout
+
+    assert decode(tmp_path / "camera.aiff") == decode(video)
@@ -0,0 +1,62 @@
+import json
+import os
+import sqlite3
+import stat
+import sys
+import textwrap
+
+import pytest
+
+import video2audio
+
+FAKE_FFPROBE = textwrap.dedent('''\
+    #!{python}
+    print({output})
+''')
+
+FFPROBE_OUTPUT = {
+    'streams': [{'index': 1, 'codec_name': 'aac', 'channels': 2, 'sample_rate': '48000'}],
+    'format': {'format_name': 'mov,mp4,m4a,3gp,3g2,mj2', 'duration': '12.5'},
+}
+
+
+class BrokenCache:
+    """Cache dont la base est verrouillée."""
+
+    def __init__(self, fail_get=False):
+        self.fail_get = fail_get
+        self.puts = 0
+
+    def get(self, path, stat):
+        if self.fail_get:
+            raise sqlite3.OperationalError("database is locked")
+        return None
+
+    def put(self, path, stat, info):
+        self.puts += 1
+        raise sqlite3.OperationalError("database is locked")
+
+
+@pytest.fixture
+def fake_ffprobe(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    ffprobe = bin_dir / "ffprobe"
+    ffprobe.write_text(FAKE_FFPROBE.format(python=sys.executable, output=repr(json.dumps(FFPROBE_OUTPUT))))
+    ffprobe.chmod(ffprobe.stat().st_mode | stat.S_IXUSR)
+    monkeypatch.setenv('PATH', f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    return ffprobe
+
+
+@pytest.mark.parametrize('fail_get', [False, True])
+def test_probe_survives_cache_errors(tmp_path, monkeypatch, fake_ffprobe, fail_get):
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b'v' * 1000)
+    cache = BrokenCache(fail_get)
+    monkeypatch.setattr(video2audio, 'get_probe_cache', lambda: cache)
+
+    info = video2audio.probe_media(str(video))
+
+    assert cache.puts == 1
+    assert info.duration == 12.5
+    assert info.audio_streams[0].codec == 'aac'
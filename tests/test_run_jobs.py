@@ -0,0 +1,27 @@
+import pytest
+
+import video2audio
+
+
+def job(name):
+    return video2audio.BatchJob(name, [video2audio.OutputSpec(name + ".mp3", 'mp3', '192k')], None)
+
+
+def test_discovery_error_is_raised_after_running_conversions(tmp_path, monkeypatch):
+    converted = []
+
+    def convert(video_file, outputs, *args, **kwargs):
+        converted.append(video_file)
+        return True
+
+    def job_source():
+        yield job(str(tmp_path / "a.mp4"))
+        raise OSError("cache de sondage illisible")
+
+    monkeypatch.setattr(video2audio, 'convert_video_to_renditions', convert)
+
+    with pytest.raises(OSError, match="cache de sondage"):
+        video2audio.run_conversion_jobs(job_source(), str(tmp_path), jobs=2)
+
+    # Le fichier découvert avant l'erreur a tout de même été converti
+    assert converted == [str(tmp_path / "a.mp4")]
@@ -0,0 +1,218 @@
+import array
+import shutil
+import subprocess
+
+import pytest
+
+import video2audio
+from video2audio import Segment, plan_segments, write_concat_list
+
+# Écart toléré entre deux encodages MP3 du même signal (amplitude du sinus: 4096)
+MP3_TOLERANCE = 200
+
+
+def test_plan_segments_covers_stream():
+    segments = plan_segments(1000, 4)
+
+    assert [segment.start for segment in segments] == [0, 250, 500, 750]
+    assert [segment.end for segment in segments] == [250, 500, 750, None]
+    assert all(segment.encode_start == segment.start for segment in segments)
+    assert all(segment.encode_end == segment.end for segment in segments)
+
+
+def test_plan_segments_aligns_on_frames():
+    segments = plan_segments(100000, 3, frame_samples=1152)
+
+    bounds = [segment.start for segment in segments[1:]]
+    assert bounds == [33408, 66816]
+    assert all(bound % 1152 == 0 for bound in bounds)
+    # Plages contiguës: chaque plage finit là où commence la suivante
+    assert [segment.end for segment in segments[:-1]] == bounds
+
+
+def test_plan_segments_overlap():
+    segments = plan_segments(100000, 3, frame_samples=1152, overlap=2304)
+
+    assert segments[0] == Segment(0, 33408, 0, 35712)
+    assert segments[1] == Segment(33408, 66816, 31104, 69120)
+    assert segments[2] == Segment(66816, None, 64512, None)
+
+
+def test_concat_list_trims_overlap(tmp_path):
+    parts = [
+        (str(tmp_path / "part0.mp3"), Segment(0, 96000, 0, 98304)),
+        (str(tmp_path / "part1.mp3"), Segment(96000, 192000, 93696, 194304)),
+        (str(tmp_path / "part2.mp3"), Segment(192000, None, 189696, None)),
+    ]
+    list_path = tmp_path / "concat.txt"
+
+    write_concat_list(str(list_path), parts, 48000)
+
+    assert list_path.read_text(encoding='utf-8').splitlines() == [
+        "ffconcat version 1.0",
+        f"file '{tmp_path / 'part0.mp3'}'",
+        "outpoint 2.000000",
+        f"file '{tmp_path / 'part1.mp3'}'",
+        "inpoint 0.048000",
+        "outpoint 2.048000",
+        f"file '{tmp_path / 'part2.mp3'}'",
+        "inpoint 0.048000",
+    ]
+
+
+def test_concat_list_rounds_towards_the_kept_frames(tmp_path):
+    parts = [
+        (str(tmp_path / "part0.mp3"), Segment(0, 77184, 0, 79488)),
+        (str(tmp_path / "part1.mp3"), Segment(77184, 154368, 74880, 156672)),
+        (str(tmp_path / "part2.mp3"), Segment(154368, None, 152064, None)),
+    ]
+    list_path = tmp_path / "concat.txt"
+
+    write_concat_list(str(list_path), parts, 44100)
+
+    # 2304 et 79488 échantillons à 44,1 kHz: 52244,9 et 1802448,98 µs. Arrondi
+    # au plus près, outpoint dépasserait la limite et garderait une trame de trop
+    assert [line for line in list_path.read_text(encoding='utf-8').splitlines() if not line.startswith('file ')] == [
+        "ffconcat version 1.0",
+        "outpoint 1.750204",
+        "inpoint 0.052245",
+        "outpoint 1.802448",
+        "inpoint 0.052245",
+    ]
+
+
+def test_concat_list_without_overlap(tmp_path):
+    parts = [
+        (str(tmp_path / "part0.wav"), Segment(0, 1000, 0, 1000)),
+        (str(tmp_path / "part1.wav"), Segment(1000, None, 1000, None)),
+    ]
+    list_path = tmp_path / "concat.txt"
+
+    write_concat_list(str(list_path), parts, 48000)
+
+    assert list_path.read_text(encoding='utf-8').splitlines() == [
+        "ffconcat version 1.0",
+        f"file '{tmp_path / 'part0.wav'}'",
+        f"file '{tmp_path / 'part1.wav'}'",
+    ]
+
+
+def test_concat_list_quotes_apostrophes(tmp_path):
+    part = tmp_path / "l'été.wav"
+    list_path = tmp_path / "concat.txt"
+
+    write_concat_list(str(list_path), [(str(part), Segment(0, None, 0, None))], 48000)
+
+    assert f"file '{tmp_path}/l'\\''été.wav'" in list_path.read_text(encoding='utf-8')
+
+
+def media_info(format_name, duration, sample_rate=48000, codec='aac'):
+    return video2audio.MediaInfo(
+        format_name, duration, None, (video2audio.AudioStream(0, codec, 2, sample_rate, None, None, None, True),)
+    )
+
+
+@pytest.fixture
+def recorded_ffmpeg(monkeypatch):
+    """Remplace FFmpeg: enregistre les commandes et la liste concat, crée les sorties."""
+    calls = []
+
+    def run_ffmpeg(ffmpeg_cmd, verbose=False, metrics=None, on_usage=None):
+        concat_list = None
+        if '-f' in ffmpeg_cmd and ffmpeg_cmd[ffmpeg_cmd.index('-f') + 1] == 'concat':
+            with open(ffmpeg_cmd[ffmpeg_cmd.index('-i') + 1], encoding='utf-8') as f:
+                concat_list = f.read().splitlines()
+        calls.append((ffmpeg_cmd, concat_list))
+        with open(ffmpeg_cmd[-1], 'wb') as f:
+            f.write(b'x' * 100)
+        return 0, None
+
+    monkeypatch.setattr(video2audio, 'run_ffmpeg', run_ffmpeg)
+    return calls
+
+
+def test_mp3_segments_overlap_and_join_on_frames(tmp_path, monkeypatch, recorded_ffmpeg):
+    source = tmp_path / "conference.mp4"
+    source.write_bytes(b'v' * 1000)
+    monkeypatch.setattr(video2audio, 'probe_media', lambda path: media_info('mov,mp4,m4a,3gp,3g2,mj2', 200.0))
+
+    assert video2audio.convert_segmented(str(source), str(tmp_path / "conference.mp3"), 'mp3', '192k', segments=3)
+
+    *encodes, (concat_cmd, concat_list) = recorded_ffmpeg
+    assert len(encodes) == 3
+    # 9 600 000 échantillons, limites arrondies à la trame de 1152, deux trames de recouvrement
+    filters = [ffmpeg_cmd[ffmpeg_cmd.index('-af') + 1] for ffmpeg_cmd, _ in encodes]
+    assert filters == [
+        "atrim=end_pts=3202560,asetpts=PTS-STARTPTS",
+        "atrim=start_pts=3197952:end_pts=6402816,asetpts=PTS-STARTPTS",
+        "atrim=start_pts=6398208,asetpts=PTS-STARTPTS",
+    ]
+    for ffmpeg_cmd, _ in encodes:
+        assert ffmpeg_cmd[ffmpeg_cmd.index('-c:a') + 1] == 'libmp3lame'
+        assert ffmpeg_cmd[ffmpeg_cmd.index('-reservoir') + 1] == '0'
+    # Recherche rapide une seconde avant la plage, horodatages du fichier conservés
+    second_cmd = encodes[1][0]
+    assert second_cmd[second_cmd.index('-ss') + 1] == "65.624000"
+    assert second_cmd.index('-copyts') < second_cmd.index('-i')
+    assert '-ss' not in encodes[0][0]
+
+    assert concat_cmd[concat_cmd.index('-c') + 1] == 'copy'
+    assert [line for line in concat_list if not line.startswith('file ')] == [
+        "ffconcat version 1.0",
+        "outpoint 66.672000",
+        "inpoint 0.048000",
+        "outpoint 66.720000",
+        "inpoint 0.048000",
+    ]
+
+
+@pytest.mark.parametrize('audio_format, format_name', [
+    # L'encodage WAV ne coûte presque rien: rien à gagner à découper
+    ('wav', 'mov,mp4,m4a,3gp,3g2,mj2'),
+    # Horodatages à la milliseconde: pas de recherche à l'échantillon près
+    ('mp3', 'matroska,webm'),
+])
+def test_falls_back_to_a_single_pass(tmp_path, monkeypatch, recorded_ffmpeg, audio_format, format_name):
+    source = tmp_path / "conference.mkv"
+    source.write_bytes(b'v' * 1000)
+    whole = []
+    monkeypatch.setattr(video2audio, 'probe_media', lambda path: media_info(format_name, 600.0))
+    monkeypatch.setattr(
+        video2audio, 'convert_video_to_audio', lambda input_path, *args, **kwargs: whole.append(input_path) or True
+    )
+
+    assert video2audio.convert_segmented(str(source), str(tmp_path / f"out.{audio_format}"), audio_format, segments=4)
+
+    assert whole == [str(source)]
+    assert recorded_ffmpeg == []
+
+
+def _decode(path):
+    return subprocess.run(
+        ["ffmpeg", "-hide_banner", "-loglevel", "error", "-i", str(path), "-f", "s16le", "-"],
+        check=True, capture_output=True
+    ).stdout
+
+
+@pytest.mark.skipif(shutil.which('ffmpeg') is None, reason="FFmpeg absent")
+def test_segmented_mp3_matches_single_pass(tmp_path, monkeypatch):
+    source = tmp_path / "source.wav"
+    subprocess.run(
+        ["ffmpeg", "-hide_banner", "-loglevel", "error", "-f", "lavfi",
+         "-i", "sine=frequency=440:sample_rate=44100:duration=7", "-c:a", "pcm_s16le", str(source)],
+        check=True
+    )
+    monkeypatch.setattr(video2audio, 'MIN_SEGMENT_SECONDS', 1)
+    monkeypatch.setattr(video2audio, 'probe_media', lambda path: media_info('wav', 7.0, 44100, 'pcm_s16le'))
+
+    segmented = tmp_path / "segmented.mp3"
+    single = tmp_path / "single.mp3"
+    assert video2audio.convert_segmented(str(source), str(segmented), 'mp3', '192k', segments=4)
+    assert video2audio.convert_video_to_audio(str(source), str(single), 'mp3', '192k')
+
+    segmented_samples = array.array('h', _decode(segmented))
+    single_samples = array.array('h', _decode(single))
+    # Délai de l'encodeur écarté: ni silence ni échantillon en trop aux jonctions
+    assert len(segmented_samples) == len(single_samples)
+    # Sans décalage ni clic, les deux encodages ne diffèrent que du bruit de quantification
+    assert max(abs(a - b) for a, b in zip(segmented_samples, single_samples)) < MP3_TOLERANCE
@@ -0,0 +1,73 @@
+import pytest
+
+import video2audio
+
+
+@pytest.mark.parametrize('cpu_count', [1, 2, 3, 4, 6, 8, 12, 16, 32, 64])
+@pytest.mark.parametrize('concurrent_jobs', [1, 2, 3, 4, 8, 16, 64])
+def test_budget_splits_the_share_without_oversubscribing(concurrent_jobs, cpu_count):
+    budget = video2audio.plan_thread_budget(concurrent_jobs, cpu_count)
+    share = max(1, cpu_count // concurrent_jobs)
+
+    assert sum(budget) == share
+    assert budget.decoder >= 1
+    assert budget.filter >= 0 and budget.encoder >= 0
+
+
+def test_single_job_gets_the_whole_machine():
+    assert video2audio.plan_thread_budget(1, 32) == video2audio.ThreadBudget(12, 8, 12)
+
+
+def thread_args(ffmpeg_cmd):
+    """Valeurs de -filter_threads et -threads, dans l'ordre de la commande."""
+    return [
+        (arg, int(ffmpeg_cmd[i + 1])) for i, arg in enumerate(ffmpeg_cmd)
+        if arg in ('-threads', '-filter_threads')
+    ]
+
+
+@pytest.mark.parametrize('cpu_count', [1, 2, 3, 4, 8, 32])
+@pytest.mark.parametrize('concurrent_jobs', [1, 2, 4, 8, 32])
+def test_command_threads_add_up_to_the_share(concurrent_jobs, cpu_count):
+    budget = video2audio.plan_thread_budget(concurrent_jobs, cpu_count)
+    ffmpeg_cmd = video2audio.build_ffmpeg_cmd("in.mp4", "out.mp3", threads=budget)
+
+    counts = [count for _, count in thread_args(ffmpeg_cmd)]
+    assert sum(counts) == max(1, cpu_count // concurrent_jobs)
+    # Jamais -threads 0, que FFmpeg lirait comme un choix automatique
+    assert all(count >= 1 for count in counts)
+
+
+def test_one_core_per_job_runs_single_threaded():
+    budget = video2audio.plan_thread_budget(8, 8)
+    ffmpeg_cmd = video2audio.build_ffmpeg_cmd("in.mp4", "out.mp3", threads=budget)
+
+    assert thread_args(ffmpeg_cmd) == [('-threads', 1)]
+    assert ffmpeg_cmd.index('-threads') < ffmpeg_cmd.index('-i')
+
+
+def test_command_threads_for_the_whole_machine():
+    budget = video2audio.plan_thread_budget(1, 32)
+    ffmpeg_cmd = video2audio.build_ffmpeg_cmd("in.mp4", "out.mp3", threads=budget)
+
+    assert thread_args(ffmpeg_cmd) == [('-filter_threads', 8), ('-threads', 12), ('-threads', 12)]
+
+
+def test_encoder_threads_are_split_between_outputs():
+    budget = video2audio.plan_thread_budget(1, 8)
+    outputs = [
+        video2audio.OutputSpec("out.mp3", 'mp3', '192k'),
+        video2audio.OutputSpec("out.wav", 'wav', None),
+    ]
+    ffmpeg_cmd = video2audio.build_multi_output_cmd("in.mp4", outputs, threads=budget)
+
+    assert budget == video2audio.ThreadBudget(3, 2, 3)
+    assert thread_args(ffmpeg_cmd) == [('-filter_threads', 2), ('-threads', 3), ('-threads', 1), ('-threads', 1)]
+
+
+def test_group_command_threads_stay_within_the_share():
+    budget = video2audio.plan_thread_budget(1, 4)
+    sources = [(f"in{i}.mp4", [video2audio.OutputSpec(f"out{i}.mp3", 'mp3', '192k')]) for i in range(3)]
+    ffmpeg_cmd = video2audio.build_group_cmd(sources, threads=budget)
+
+    assert sum(count for _, count in thread_args(ffmpeg_cmd)) <= 4
@@ -0,0 +1,32 @@
+import video2audio
+
+
+def test_watch_skips_files_without_selected_tracks(tmp_path, monkeypatch):
+    input_dir = tmp_path / "in"
+    input_dir.mkdir()
+    silent = str(input_dir / "silent.mp4")
+    speech = str(input_dir / "speech.mp4")
+
+    def plan_outputs(video_file, stem, renditions, info=None, tracks=None):
+        if video_file == silent:
+            return ()
+        return [video2audio.OutputSpec(stem + ".mp3", 'mp3', '192k')]
+
+    converted = []
+
+    def convert(video_file, outputs, *args, **kwargs):
+        converted.append(video_file)
+        return True
+
+    monkeypatch.setattr(video2audio, 'watch_video_files', lambda *args: iter([silent, speech]))
+    monkeypatch.setattr(video2audio, 'plan_outputs', plan_outputs)
+    monkeypatch.setattr(video2audio, 'convert_video_to_renditions', convert)
+
+    result = video2audio.watch_folder(
+        str(input_dir), str(tmp_path / "out"), jobs=1,
+        tracks=video2audio.TrackSelection(None, None)
+    )
+
+    # La vidéo sans piste retenue est sautée, la suivante est convertie
+    assert result == (1, 0)
+    assert converted == [speech]
@@ -11,10 +11,27 @@ Utilise FFmpeg comme moteur de conversion.
 import os
 import sys
 import argparse
+import asyncio
+import bisect
+import contextlib
+import ctypes
+import ctypes.util
+import io
 import subprocess
-import glob
+import json
+import re
+import time
 from pathlib import Path
 import logging
+import queue
+import select
+import shutil
+import sqlite3
+import struct
+import tempfile
+import threading
+from collections import namedtuple, Counter, deque
+from concurrent.futures import ThreadPoolExecutor
 
 # Configuration du logging
 logging.basicConfig(
@@ -24,24 +41,3345 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def check_ffmpeg():
-    """Vérifie si FFmpeg est installé sur le système."""
+# Formats et qualités proposés en ligne de commande
+AUDIO_FORMATS = ("mp3", "wav", "auto")
+AUDIO_QUALITIES = ("128k", "192k", "256k", "320k")
+
+# Encodeur FFmpeg nécessaire à chaque format de sortie (auto peut retomber sur mp3)
+FORMAT_ENCODERS = {
+    'mp3': ('libmp3lame',),
+    'wav': ('pcm_s16le',),
+    'auto': ('libmp3lame',)
+}
+
+# Ce que sait faire le binaire FFmpeg installé
+FfmpegCapabilities = namedtuple('FfmpegCapabilities', ['path', 'version', 'encoders', 'muxers', 'filters'])
+
+def user_cache_dir():
+    """Répertoire de cache de l'utilisateur pour video2audio."""
+    cache_home = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(cache_home, 'video2audio')
+
+def _ffmpeg_listing(binary, option):
+    """Noms listés par `ffmpeg <option>` (-encoders, -muxers, -filters), après l'en-tête."""
+    result = subprocess.run(
+        [binary, "-hide_banner", option],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        check=True
+    )
+    
+    names = set()
+    for line in result.stdout.decode('utf-8', errors='replace').splitlines():
+        parts = line.split()
+        # Une entrée: drapeaux, nom(s) séparés par des virgules, description.
+        # Les lignes de légende ont un "=" en deuxième position.
+        if len(parts) < 3 or parts[1] == '=' or not line.startswith(' '):
+            continue
+        if option == '-muxers' and 'E' not in parts[0]:
+            continue
+        names.update(parts[1].split(','))
+    return frozenset(names)
+
+def probe_ffmpeg_capabilities(binary):
+    """
+    Interroge un binaire FFmpeg: version, encodeurs, muxers et filtres.
+    
+    Args:
+        binary (str): Chemin du binaire FFmpeg
+    
+    Returns:
+        FfmpegCapabilities: Capacités du binaire
+    """
+    result = subprocess.run(
+        [binary, "-version"],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        check=True
+    )
+    first_line = result.stdout.decode('utf-8', errors='replace').partition('\n')[0]
+    match = re.match(r'ffmpeg version (\S+)', first_line)
+    
+    return FfmpegCapabilities(
+        binary,
+        match.group(1) if match else first_line,
+        _ffmpeg_listing(binary, '-encoders'),
+        _ffmpeg_listing(binary, '-muxers'),
+        _ffmpeg_listing(binary, '-filters')
+    )
+
+def load_ffmpeg_capabilities(binary, cache_path=None):
+    """
+    Capacités du binaire FFmpeg, lues dans le cache disque tant que le
+    binaire n'a pas changé (même chemin, date de modification et taille).
+    
+    Args:
+        binary (str): Chemin du binaire FFmpeg
+        cache_path (str): Fichier de cache (défaut: dans user_cache_dir())
+    
+    Returns:
+        FfmpegCapabilities: Capacités du binaire
+    """
+    cache_path = cache_path or os.path.join(user_cache_dir(), 'ffmpeg-capabilities.json')
+    binary = os.path.realpath(binary)
+    stat = os.stat(binary)
+    key = [stat.st_mtime_ns, stat.st_size]
+    
+    try:
+        with open(cache_path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+    
+    entry = cache.get(binary)
+    if isinstance(entry, dict) and entry.get('key') == key:
+        return FfmpegCapabilities(
+            binary, entry['version'], frozenset(entry['encoders']), frozenset(entry['muxers']),
+            frozenset(entry['filters'])
+        )
+    
+    capabilities = probe_ffmpeg_capabilities(binary)
+    cache[binary] = {
+        'key': key,
+        'version': capabilities.version,
+        'encoders': sorted(capabilities.encoders),
+        'muxers': sorted(capabilities.muxers),
+        'filters': sorted(capabilities.filters)
+    }
+    
+    # Un cache illisible ou non inscriptible ne doit pas empêcher la conversion
+    try:
+        os.makedirs(os.path.dirname(cache_path) or '.', exist_ok=True)
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.debug(f"Impossible d'enregistrer les capacités de FFmpeg: {e}")
+    
+    return capabilities
+
+_ffmpeg_capabilities = None
+_ffmpeg_capabilities_lock = threading.Lock()
+
+def get_ffmpeg_capabilities():
+    """
+    Capacités du FFmpeg trouvé dans le PATH, déterminées au premier appel.
+    
+    Returns:
+        FfmpegCapabilities: Capacités, ou None si FFmpeg est absent ou inutilisable
+    """
+    global _ffmpeg_capabilities
+    with _ffmpeg_capabilities_lock:
+        if _ffmpeg_capabilities is None:
+            binary = shutil.which("ffmpeg")
+            if binary is None:
+                return None
+            try:
+                _ffmpeg_capabilities = load_ffmpeg_capabilities(binary)
+            except (OSError, subprocess.SubprocessError):
+                return None
+        return _ffmpeg_capabilities
+
+def check_ffmpeg(audio_formats=()):
+    """
+    Vérifie si FFmpeg est installé sur le système, avec les encodeurs
+    nécessaires aux formats demandés.
+    
+    Args:
+        audio_formats (iterable): Formats de sortie qui seront produits
+    
+    Returns:
+        bool: True si FFmpeg peut produire ces formats
+    """
+    capabilities = get_ffmpeg_capabilities()
+    if capabilities is None:
+        logger.error("FFmpeg n'est pas installé ou n'est pas dans le PATH.")
+        logger.error("Veuillez installer FFmpeg: https://ffmpeg.org/download.html")
+        return False
+    
+    missing = sorted({
+        encoder
+        for audio_format in audio_formats
+        for encoder in FORMAT_ENCODERS.get(audio_format, ())
+        if encoder not in capabilities.encoders
+    })
+    if missing:
+        logger.error(f"FFmpeg {capabilities.version} ne fournit pas les encodeurs nécessaires: {', '.join(missing)}")
+        return False
+    
+    return True
+
+# Répartition des threads FFmpeg d'une conversion; 0 signifie que l'étape
+# n'a pas de thread à elle: son option n'est pas passée à FFmpeg (qui lirait
+# -threads 0 comme un choix automatique), et les codecs et filtres audio, qui
+# ne se parallélisent pas, s'exécutent dans le thread de l'étape
+ThreadBudget = namedtuple('ThreadBudget', ['decoder', 'filter', 'encoder'])
+
+def plan_thread_budget(concurrent_jobs, cpu_count=None):
+    """
+    Répartit les cœurs de la machine entre les conversions simultanées.
+    
+    Chaque conversion reçoit une part égale des cœurs, au moins un,
+    partagée entre les filtres (un quart), le décodage (un peu plus de la
+    moitié du reste) et l'encodage: les trois parts totalisent exactement
+    la part de la conversion. Quand il ne reste qu'une conversion, elle
+    reçoit toute la machine.
+    
+    Args:
+        concurrent_jobs (int): Nombre de conversions qui tourneront en même temps
+        cpu_count (int): Nombre de cœurs disponibles (défaut: détecté)
+    
+    Returns:
+        ThreadBudget: Nombre de threads de décodage, de filtres et d'encodage
+    """
+    cores = cpu_count or os.cpu_count() or 1
+    share = max(1, cores // max(1, concurrent_jobs))
+    
+    filters = share // 4
+    decoder = max(1, (share - filters + 1) // 2)
+    encoder = share - filters - decoder
+    return ThreadBudget(decoder, filters, encoder)
+
+# Sortie d'une conversion: fichier, format (mp3, wav, copy ou transcode), qualité et,
+# pour extraire une piste précise, son index de flux dans l'entrée
+# muxer: format de conteneur imposé (-f), indispensable quand la sortie est un tube
+OutputSpec = namedtuple(
+    'OutputSpec', ['path', 'audio_format', 'quality', 'stream', 'muxer'], defaults=(None, None)
+)
+
+def build_ffmpeg_cmd(input_path, output_path, audio_format='mp3', quality='192k', threads=None,
+                     overwrite=False):
+    """
+    Construit la ligne de commande FFmpeg d'une conversion.
+    
+    Args:
+        input_path (str): Chemin vers le fichier vidéo d'entrée
+        output_path (str): Chemin vers le fichier audio de sortie
+        audio_format (str): Format de sortie (mp3, wav, copy pour copier
+            la piste audio dans le conteneur désigné par l'extension, ou
+            transcode pour l'y encoder quand la copie a échoué)
+        quality (str): Qualité audio (128k, 192k, 256k, 320k)
+        threads (ThreadBudget): Threads alloués (défaut: choix de FFmpeg)
+        overwrite (bool): Écraser le fichier de sortie s'il existe
+    
+    Returns:
+        list: Arguments de la commande FFmpeg
+    """
+    return build_multi_output_cmd(input_path, [OutputSpec(output_path, audio_format, quality)], threads, overwrite)
+
+def build_multi_output_cmd(input_path, outputs, threads=None, overwrite=False, progress=False,
+                           loglevel=None):
+    """
+    Construit une commande FFmpeg qui produit plusieurs sorties en une passe.
+    
+    L'entrée n'est lue et décodée qu'une fois: FFmpeg transmet les
+    échantillons décodés à l'encodeur de chaque sortie.
+    
+    Args:
+        input_path (str): Chemin vers le fichier vidéo d'entrée
+        outputs (list): Sorties à produire (OutputSpec)
+        threads (ThreadBudget): Threads alloués (défaut: choix de FFmpeg),
+            les threads d'encodage étant partagés entre les sorties
+        overwrite (bool): Écraser les fichiers de sortie existants
+        progress (bool): Écrire l'avancement sur la sortie standard (-progress)
+        loglevel (str): Niveau des messages de FFmpeg (défaut: celui de FFmpeg)
+    
+    Returns:
+        list: Arguments de la commande FFmpeg
+    """
+    ffmpeg_cmd = ["ffmpeg"]
+    
+    if loglevel:
+        ffmpeg_cmd.extend(["-hide_banner", "-loglevel", loglevel])
+        if not progress:
+            # Sous le niveau info, la ligne time= n'est écrite qu'avec -stats
+            ffmpeg_cmd.append("-stats")
+    
+    if overwrite:
+        ffmpeg_cmd.append("-y")
+    
+    if progress:
+        # Blocs clé=valeur à intervalle régulier, lus par parse_progress()
+        ffmpeg_cmd.extend(["-progress", "pipe:1", "-nostats"])
+    
+    if threads and threads.filter:
+        ffmpeg_cmd.extend(["-filter_threads", str(threads.filter)])
+    if threads and threads.decoder:
+        # -threads avant -i s'applique au décodeur de l'entrée
+        ffmpeg_cmd.extend(["-threads", str(threads.decoder)])
+    
+    ffmpeg_cmd.extend(["-i", input_path])
+    
+    for output in outputs:
+        ffmpeg_cmd.extend(_output_args(output, 0, threads.encoder // len(outputs) if threads else None))
+    
+    return ffmpeg_cmd
+
+def build_group_cmd(sources, threads=None, overwrite=False, loglevel=None):
+    """
+    Construit une commande FFmpeg qui convertit plusieurs vidéos à la fois.
+    
+    Chaque vidéo est une entrée (-i) de la commande; ses sorties lisent
+    explicitement sa piste audio (-map N:a:0), sans quoi FFmpeg choisirait
+    une seule piste parmi toutes les entrées.
+    
+    Args:
+        sources (list): Couples (chemin de la vidéo, sorties OutputSpec)
+        threads (ThreadBudget): Threads alloués (défaut: choix de FFmpeg),
+            partagés entre les entrées et entre les sorties
+        overwrite (bool): Écraser les fichiers de sortie existants
+        loglevel (str): Niveau des messages de FFmpeg (défaut: celui de FFmpeg)
+    
+    Returns:
+        list: Arguments de la commande FFmpeg
+    """
+    ffmpeg_cmd = ["ffmpeg"]
+    
+    if loglevel:
+        ffmpeg_cmd.extend(["-hide_banner", "-loglevel", loglevel])
+    
+    if overwrite:
+        ffmpeg_cmd.append("-y")
+    
+    output_count = sum(len(outputs) for _, outputs in sources)
+    for input_path, _ in sources:
+        if threads and threads.decoder // len(sources):
+            ffmpeg_cmd.extend(["-threads", str(threads.decoder // len(sources))])
+        ffmpeg_cmd.extend(["-i", input_path])
+    
+    for input_index, (_, outputs) in enumerate(sources):
+        for output in outputs:
+            ffmpeg_cmd.extend(_output_args(
+                output, input_index, threads.encoder // output_count if threads else None, map_audio=True
+            ))
+    
+    return ffmpeg_cmd
+
+def _output_args(output, input_index=0, encoder_threads=None, map_audio=False):
+    """
+    Options FFmpeg d'une sortie, suivies de son chemin.
+    
+    Args:
+        output (OutputSpec): Sortie à produire
+        input_index (int): Entrée dont la sortie lit la piste audio
+        encoder_threads (int): Threads d'encodage (défaut ou 0: aucune option)
+        map_audio (bool): Toujours désigner la piste audio de l'entrée, même
+            quand FFmpeg la choisirait seul
+    
+    Returns:
+        list: Arguments de la sortie
+    """
+    output_args = ["-vn"]  # Supprime la piste vidéo
+    
+    if output.stream is not None:
+        output_args.extend(["-map", f"{input_index}:{output.stream}"])
+    elif map_audio or output.audio_format not in ('mp3', 'wav'):
+        # La piste analysée par resolve_audio_format()
+        output_args.extend(["-map", f"{input_index}:a:0"])
+    
+    # Ajouter les options en fonction du format
+    if output.audio_format == 'mp3':
+        output_args.extend([
+            "-c:a", "libmp3lame",
+            "-b:a", output.quality
+        ])
+    elif output.audio_format == 'wav':
+        output_args.extend([
+            "-c:a", "pcm_s16le"
+        ])
+    elif output.audio_format == 'transcode':
+        # Repli d'une copie refusée: encodage dans le même conteneur
+        container = os.path.splitext(output.path)[1][1:].lower()
+        output_args.extend(["-c:a", COPY_FALLBACK_ENCODERS[container]])
+        if container not in LOSSLESS_CONTAINERS:
+            output_args.extend(["-b:a", output.quality])
+    else:
+        output_args.extend([
+            "-c:a", "copy"  # Essayer de copier le codec audio tel quel
+        ])
+    
+    if encoder_threads:
+        # -threads après -i s'applique à l'encodeur de la sortie
+        output_args.extend(["-threads", str(encoder_threads)])
+    
+    if output.muxer:
+        output_args.extend(["-f", output.muxer])
+    
+    # Ajouter le fichier de sortie
+    output_args.append(output.path)
+    return output_args
+
+# Conteneur de sortie pour chaque codec audio copiable sans réencodage
+STREAM_COPY_CONTAINERS = {
+    'aac': 'm4a',
+    'alac': 'm4a',
+    'mp3': 'mp3',
+    'opus': 'opus',
+    'vorbis': 'ogg',
+    'flac': 'flac',
+    'ac3': 'ac3',
+    'eac3': 'eac3',
+    # PCM des caméras (MOV, AVI, MKV): WAV n'accepte que les variantes
+    # petit-boutistes, AIFF les gros-boutistes
+    'pcm_s16le': 'wav',
+    'pcm_s24le': 'wav',
+    'pcm_s32le': 'wav',
+    'pcm_f32le': 'wav',
+    'pcm_f64le': 'wav',
+    'pcm_u8': 'wav',
+    'pcm_alaw': 'wav',
+    'pcm_mulaw': 'wav',
+    'pcm_s8': 'aiff',
+    'pcm_s16be': 'aiff',
+    'pcm_s24be': 'aiff',
+    'pcm_s32be': 'aiff',
+    'pcm_f32be': 'aiff',
+    'pcm_f64be': 'aiff'
+}
+
+# Encodeur de chaque conteneur de copie, quand FFmpeg refuse de copier la
+# piste telle quelle (horodatages invalides, variante du codec que le
+# conteneur n'accepte pas...): la sortie garde son chemin
+COPY_FALLBACK_ENCODERS = {
+    'm4a': 'aac',
+    'mp3': 'libmp3lame',
+    'opus': 'libopus',
+    'ogg': 'libvorbis',
+    'flac': 'flac',
+    'ac3': 'ac3',
+    'eac3': 'eac3',
+    'wav': 'pcm_s16le',
+    'aiff': 'pcm_s16be'
+}
+
+# Conteneurs de copie sans perte, encodés sans débit (-b:a)
+LOSSLESS_CONTAINERS = frozenset(('flac', 'wav', 'aiff'))
+
+# Format utilisé en mode auto quand la piste audio ne peut pas être copiée
+AUTO_FALLBACK_FORMAT = 'mp3'
+
+# Muxer diffusable (sans retour en arrière) pour chaque format ou codec copié,
+# utilisé quand la sortie est un tube; alac n'a pas de conteneur diffusable
+PIPE_MUXERS = {
+    'mp3': 'mp3',
+    'wav': 'wav',
+    'aac': 'adts',
+    'opus': 'ogg',
+    'vorbis': 'ogg',
+    'flac': 'flac',
+    'ac3': 'ac3',
+    'eac3': 'eac3'
+}
+
+# Chemin désignant l'entrée ou la sortie standard sur la ligne de commande
+STDIO_PATH = '-'
+
+# Taille des blocs recopiés entre un flux Python et FFmpeg
+PIPE_CHUNK_SIZE = 64 * 1024
+
+# Résultat compact d'une analyse FFprobe
+MediaInfo = namedtuple('MediaInfo', ['format_name', 'duration', 'bit_rate', 'audio_streams'])
+AudioStream = namedtuple('AudioStream', [
+    'index', 'codec', 'channels', 'sample_rate', 'bit_rate', 'language', 'title', 'default'
+])
+
+# Analyse d'un fichier que FFprobe n'a pas pu lire
+UNREADABLE_MEDIA = MediaInfo(None, None, None, ())
+
+def build_ffprobe_cmd(input_path):
+    """Construit la commande FFprobe qui décrit le conteneur et ses pistes audio."""
+    return [
+        "ffprobe",
+        "-v", "error",
+        "-select_streams", "a",
+        "-show_entries",
+        "format=format_name,duration,bit_rate:"
+        "stream=index,codec_name,channels,sample_rate,bit_rate:"
+        "stream_tags=language,title:stream_disposition=default",
+        "-of", "json",
+        input_path
+    ]
+
+def _number(value, kind=float):
+    """Convertit un champ numérique de FFprobe, qui peut valoir 'N/A'."""
+    try:
+        return kind(value)
+    except (TypeError, ValueError):
+        return None
+
+def parse_ffprobe_output(data):
+    """
+    Construit un MediaInfo à partir de la sortie JSON de build_ffprobe_cmd().
+    
+    Args:
+        data (bytes): Sortie standard de FFprobe
+    
+    Returns:
+        MediaInfo: Description du fichier (UNREADABLE_MEDIA si illisible)
+    """
+    try:
+        probe = json.loads(data.decode('utf-8', errors='replace') or '{}')
+    except ValueError:
+        return UNREADABLE_MEDIA
+    
+    streams = []
+    for stream in probe.get('streams', []):
+        tags = stream.get('tags', {})
+        streams.append(AudioStream(
+            stream.get('index'),
+            stream.get('codec_name'),
+            _number(stream.get('channels'), int),
+            _number(stream.get('sample_rate'), int),
+            _number(stream.get('bit_rate'), int),
+            tags.get('language'),
+            tags.get('title'),
+            bool(stream.get('disposition', {}).get('default'))
+        ))
+    
+    container = probe.get('format', {})
+    return MediaInfo(
+        container.get('format_name'),
+        _number(container.get('duration')),
+        _number(container.get('bit_rate'), int),
+        tuple(streams)
+    )
+
+def default_probe_cache_path():
+    """Emplacement par défaut du cache des analyses (répertoire de cache de l'utilisateur)."""
+    return os.path.join(user_cache_dir(), 'probe.sqlite3')
+
+class ProbeCache:
+    """
+    Cache SQLite des analyses FFprobe.
+    
+    Une analyse est valable tant que le fichier garde le même chemin, la
+    même taille, la même date de modification et le même inode. La
+    connexion est partagée entre threads et protégée par un verrou.
+    """
+    
+    def __init__(self, path=None):
+        self.path = path or default_probe_cache_path()
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS probe ("
+            "path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, inode INTEGER, info TEXT)"
+        )
+    
+    def get(self, path, stat):
+        """Retourne l'analyse en cache de `path` si le fichier n'a pas changé, sinon None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns, inode, info FROM probe WHERE path = ?", (path,)
+            ).fetchone()
+        if row is None or tuple(row[:3]) != (stat.st_size, stat.st_mtime_ns, stat.st_ino):
+            return None
+        
+        format_name, duration, bit_rate, streams = json.loads(row[3])
+        return MediaInfo(format_name, duration, bit_rate, tuple(AudioStream(*stream) for stream in streams))
+    
+    def put(self, path, stat, info):
+        """Enregistre l'analyse de `path` pour l'état de fichier `stat`."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO probe (path, size, mtime_ns, inode, info) VALUES (?, ?, ?, ?, ?)",
+                (path, stat.st_size, stat.st_mtime_ns, stat.st_ino, json.dumps(info))
+            )
+    
+    def close(self):
+        """Ferme la base."""
+        with self._lock:
+            self._conn.close()
+
+_probe_cache = None
+_probe_cache_enabled = True
+_probe_cache_lock = threading.Lock()
+
+def configure_probe_cache(enabled=True, path=None):
+    """
+    Active ou désactive le cache partagé des analyses.
+    
+    Args:
+        enabled (bool): Utiliser le cache
+        path (str): Emplacement de la base (défaut: default_probe_cache_path())
+    """
+    global _probe_cache, _probe_cache_enabled
+    with _probe_cache_lock:
+        if _probe_cache is not None:
+            _probe_cache.close()
+        _probe_cache = ProbeCache(path) if enabled and path else None
+        _probe_cache_enabled = enabled
+
+def get_probe_cache():
+    """Cache partagé des analyses, ouvert au premier usage (None si désactivé ou inutilisable)."""
+    global _probe_cache, _probe_cache_enabled
+    with _probe_cache_lock:
+        if _probe_cache is None and _probe_cache_enabled:
+            try:
+                _probe_cache = ProbeCache()
+            except (OSError, sqlite3.Error) as e:
+                logger.warning(f"Cache des analyses indisponible, analyses non conservées: {e}")
+                _probe_cache_enabled = False
+        return _probe_cache
+
+# Le cache n'est qu'une optimisation: une base verrouillée, en lecture
+# seule, corrompue ou pleine ne fait que relancer FFprobe
+
+def _cached_probe(cache, path, stat):
+    """Analyse en cache de `path` (None si absente, périmée ou illisible)."""
+    if cache is None:
+        return None
+    try:
+        return cache.get(path, stat)
+    except sqlite3.Error as e:
+        logger.debug(f"Lecture du cache des analyses impossible pour {path}: {e}")
+        return None
+
+def _store_probe(cache, path, stat, info):
+    """Enregistre une analyse dans le cache, si possible."""
+    if cache is None:
+        return
+    try:
+        cache.put(path, stat, info)
+    except sqlite3.Error as e:
+        logger.debug(f"Écriture du cache des analyses impossible pour {path}: {e}")
+
+def probe_media(input_path):
+    """
+    Analyse un fichier avec FFprobe, en passant par le cache des analyses.
+    
+    Args:
+        input_path (str): Chemin vers le fichier vidéo
+    
+    Returns:
+        MediaInfo: Description du fichier (UNREADABLE_MEDIA si FFprobe n'a
+        pas pu le lire), ou None si le fichier ou FFprobe est introuvable
+    """
+    path = os.path.abspath(input_path)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    
+    cache = get_probe_cache()
+    info = _cached_probe(cache, path, stat)
+    if info is not None:
+        return info
+    
+    try:
+        result = subprocess.run(
+            build_ffprobe_cmd(path),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL
+        )
+    except (subprocess.SubprocessError, FileNotFoundError) as e:
+        logger.warning(f"Analyse impossible de {input_path}: {e}")
+        return None
+    
+    info = parse_ffprobe_output(result.stdout) if result.returncode == 0 else UNREADABLE_MEDIA
+    _store_probe(cache, path, stat, info)
+    return info
+
+def _timed_probe(path, metrics):
+    """probe_media() chronométré comme étape probe."""
+    with timed(metrics, 'probe'):
+        return probe_media(path)
+
+def probe_many(paths, jobs=None, metrics=None):
+    """
+    Analyse des fichiers en parallèle, dans l'ordre où ils sont fournis.
+    
+    Les analyses absentes du cache sont lancées par un pool de threads, en
+    gardant une fenêtre bornée d'analyses en avance: `paths` peut être un
+    générateur sans fin.
+    
+    Args:
+        paths (iterable): Chemins des fichiers à analyser
+        jobs (int): Nombre d'analyses simultanées (défaut: nombre de CPU)
+        metrics (RunMetrics): Métriques à alimenter (durée de chaque analyse)
+    
+    Yields:
+        tuple: (chemin, MediaInfo ou None)
+    """
+    jobs = max(1, jobs or default_jobs())
+    window = deque()
+    
+    with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix='video2audio-probe') as executor:
+        for path in paths:
+            window.append((path, executor.submit(_timed_probe, path, metrics)))
+            if len(window) >= 2 * jobs:
+                path, future = window.popleft()
+                yield path, future.result()
+        while window:
+            path, future = window.popleft()
+            yield path, future.result()
+
+def resolve_audio_format(input_path, audio_format, info=None, stream=None):
+    """
+    Résout le format auto: copie de la piste audio si son codec a un
+    conteneur adapté, encodage sinon.
+    
+    Args:
+        input_path (str): Chemin vers le fichier vidéo
+        audio_format (str): Format demandé (mp3, wav ou auto)
+        info (MediaInfo): Analyse déjà faite (défaut: probe_media())
+        stream (AudioStream): Piste à extraire (défaut: la première)
+    
+    Returns:
+        tuple: (format pour build_ffmpeg_cmd, extension du fichier de sortie)
+    """
+    if audio_format != 'auto':
+        return audio_format, audio_format
+    
+    if stream is None:
+        if info is None:
+            info = probe_media(input_path)
+        stream = info.audio_streams[0] if info and info.audio_streams else None
+    codec = stream.codec if stream else None
+    container = STREAM_COPY_CONTAINERS.get(codec)
+    if container:
+        return 'copy', container
+    
+    logger.debug(f"Codec {codec} non copiable, encodage en {AUTO_FALLBACK_FORMAT}: {input_path}")
+    return AUTO_FALLBACK_FORMAT, AUTO_FALLBACK_FORMAT
+
+# Niveau des messages de FFmpeg quand sa sortie d'erreur est capturée: les
+# erreurs seulement (build_multi_output_cmd ajoute -stats pour garder la
+# ligne time=, que FFmpeg n'écrit sinon qu'à partir du niveau info)
+CAPTURE_LOGLEVEL = 'error'
+
+# Lignes de la sortie d'erreur conservées: les dernières, et celles qui
+# signalent une erreur
+STDERR_TAIL_LINES = 20
+STDERR_ERROR_LINES = 10
+STDERR_MAX_LINE = 4096
+
+_STDERR_ERROR = re.compile(
+    r'error|invalid|could not|unable|failed|no such|denied|not found|unknown|unsupported|corrupt',
+    re.IGNORECASE
+)
+_STDERR_LINE_END = re.compile(rb'[\r\n]')
+
+class StderrTail:
+    """
+    Lecture bornée de la sortie d'erreur de FFmpeg.
+    
+    Seules les dernières lignes et les lignes d'erreur sont conservées, et
+    une ligne trop longue est tronquée: la mémoire reste constante quelle
+    que soit la durée de la conversion. Les statistiques, séparées par des
+    retours chariot, comptent comme des lignes.
+    """
+    
+    def __init__(self, tail_lines=STDERR_TAIL_LINES, error_lines=STDERR_ERROR_LINES):
+        self.lines = deque(maxlen=tail_lines)
+        self.errors = deque(maxlen=error_lines)
+        self._partial = b''
+        self._thread = None
+    
+    def _add(self, raw):
+        line = raw[:STDERR_MAX_LINE].decode('utf-8', errors='replace').strip()
+        if not line:
+            return
+        self.lines.append(line)
+        if _STDERR_ERROR.search(line):
+            self.errors.append(line)
+    
+    def feed(self, chunk):
+        """Ajoute un bloc lu sur la sortie d'erreur."""
+        pieces = _STDERR_LINE_END.split(self._partial + chunk)
+        self._partial = pieces.pop()[-STDERR_MAX_LINE:]
+        for piece in pieces:
+            self._add(piece)
+    
+    def consume(self, stream):
+        """Lit `stream` jusqu'à la fin, puis le ferme."""
+        try:
+            for chunk in iter(lambda: stream.read1(PIPE_CHUNK_SIZE), b''):
+                self.feed(chunk)
+            self._add(self._partial)
+            self._partial = b''
+        finally:
+            stream.close()
+    
+    def start(self, stream):
+        """Lit `stream` dans un thread, quand le thread appelant lit déjà un autre tube."""
+        self._thread = threading.Thread(target=self.consume, args=(stream,), daemon=True)
+        self._thread.start()
+    
+    def join(self):
+        """Attend la fin de la lecture lancée par start()."""
+        if self._thread is not None:
+            self._thread.join()
+    
+    def summary(self):
+        """Contexte d'un échec: les lignes d'erreur, à défaut les dernières lignes."""
+        lines = self.errors or list(self.lines)[-3:]
+        return ' | '.join(lines) or None
+
+def log_ffmpeg_failure(subject, returncode, stderr):
+    """
+    Signale l'échec de FFmpeg, avec le contexte de sa sortie d'erreur s'il a été capturé.
+    
+    Args:
+        subject (str): Ce que FFmpeg convertissait (fichier d'entrée, groupe...)
+        returncode (int): Code de sortie de FFmpeg
+        stderr (StderrTail): Fin de la sortie d'erreur (None si non capturée)
+    """
+    logger.error(f"Erreur lors de la conversion de {subject}: FFmpeg a retourné le code {returncode}")
+    details = stderr.summary() if stderr is not None else None
+    if details:
+        logger.error(f"Détails: {details}")
+
+# Avancement d'une conversion: secondes d'audio produites, vitesse par rapport
+# au temps réel (None si inconnue), octets écrits, et fin de la conversion
+Progress = namedtuple('Progress', ['out_time', 'speed', 'total_size', 'ended'])
+
+def parse_progress(lines):
+    """
+    Lit au fil de l'eau la sortie de `ffmpeg -progress`.
+    
+    FFmpeg écrit des blocs de lignes clé=valeur, chacun terminé par
+    progress=continue (ou progress=end pour le dernier).
+    
+    Args:
+        lines (iterable): Lignes de la sortie, en octets ou en texte
+    
+    Yields:
+        Progress: Avancement à la fin de chaque bloc
+    """
+    fields = {}
+    for line in lines:
+        if isinstance(line, bytes):
+            line = line.decode('ascii', errors='replace')
+        key, sep, value = line.strip().partition('=')
+        if not sep:
+            continue
+        if key != 'progress':
+            fields[key] = value.strip()
+            continue
+        
+        # out_time_ms est aussi en microsecondes (bogue historique de FFmpeg)
+        out_time = _number(fields.get('out_time_us') or fields.get('out_time_ms'), int)
+        speed = _number(fields.get('speed', '').rstrip('x'))
+        yield Progress(
+            out_time / 1e6 if out_time is not None and out_time >= 0 else None,
+            speed,
+            _number(fields.get('total_size'), int),
+            value == 'end'
+        )
+        fields = {}
+
+def format_duration(seconds):
+    """Durée lisible (H:MM:SS), ou ? si inconnue."""
+    if seconds is None:
+        return '?'
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}"
+
+# Étapes chronométrées d'une conversion
+STAGES = ('discover', 'probe', 'spawn', 'encode', 'finalize')
+
+# Bornes des histogrammes de durée, en secondes
+STAGE_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0)
+
+class TraceRecorder:
+    """
+    Chronologie d'une exécution au format Chrome trace (Perfetto, chrome://tracing).
+    
+    Chaque intervalle est enregistré avec le thread qui l'a exécuté, ce qui
+    montre la répartition des conversions entre threads, les temps morts et
+    les conversions les plus longues.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._origin = time.monotonic()
+        self._events = []
+        self._threads = {}
+    
+    def add(self, name, category, started, seconds, args=None):
+        """Enregistre un intervalle commencé à `started` (time.monotonic()) dans le thread courant."""
+        thread = threading.current_thread()
+        event = {
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': round((started - self._origin) * 1e6),
+            'dur': round(seconds * 1e6),
+            'pid': os.getpid(),
+            'tid': thread.ident
+        }
+        if args:
+            event['args'] = args
+        with self._lock:
+            self._threads[thread.ident] = thread.name
+            self._events.append(event)
+    
+    @contextlib.contextmanager
+    def span(self, name, category, **args):
+        """Enregistre le bloc `with` comme un intervalle; le dictionnaire produit peut être complété."""
+        started = time.monotonic()
+        try:
+            yield args
+        finally:
+            self.add(name, category, started, time.monotonic() - started, args)
+    
+    def write(self, path):
+        """Enregistre la chronologie, avec le nom de chaque thread."""
+        with self._lock:
+            pid = os.getpid()
+            metadata = [
+                {'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+                for tid, name in self._threads.items()
+            ]
+            trace = {'traceEvents': metadata + self._events, 'displayTimeUnit': 'ms'}
+        
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(trace, f)
+        os.replace(tmp_path, path)
+
+class RunMetrics:
+    """
+    Compteurs et histogrammes de durée par étape d'une exécution.
+    
+    Les étapes (STAGES) sont mesurées avec une horloge monotone; un même
+    objet peut être alimenté par plusieurs threads. Le résultat s'exporte
+    en rapport JSON ou en fichier texte pour le collecteur textfile de
+    node_exporter. Avec un TraceRecorder, chaque étape chronométrée est
+    aussi placée sur la chronologie.
+    
+    Args:
+        trace (TraceRecorder): Chronologie à alimenter (défaut: aucune)
+    """
+    
+    def __init__(self, trace=None):
+        self.trace = trace
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.counters = Counter()
+        self._buckets = {stage: [0] * len(STAGE_BUCKETS) for stage in STAGES}
+        self._sums = dict.fromkeys(STAGES, 0.0)
+        self._counts = dict.fromkeys(STAGES, 0)
+        self.child_usage = None
+    
+    def observe(self, stage, seconds, started=None):
+        """Enregistre une durée pour une étape, commencée à `started` si la chronologie est tenue."""
+        if self.trace is not None and started is not None:
+            self.trace.add(stage, 'stage', started, seconds)
+        position = bisect.bisect_left(STAGE_BUCKETS, seconds)
+        with self._lock:
+            buckets = self._buckets.setdefault(stage, [0] * len(STAGE_BUCKETS))
+            if position < len(buckets):
+                buckets[position] += 1
+            self._sums[stage] = self._sums.get(stage, 0.0) + seconds
+            self._counts[stage] = self._counts.get(stage, 0) + 1
+    
+    def count(self, name, value=1):
+        """Incrémente un compteur."""
+        with self._lock:
+            self.counters[name] += value
+    
+    def add_usage(self, usage):
+        """Cumule les ressources d'un processus FFmpeg (ChildUsage)."""
+        if usage is None:
+            return
+        with self._lock:
+            self.child_usage = add_child_usage(self.child_usage, usage)
+    
+    @contextlib.contextmanager
+    def time(self, stage):
+        """Chronomètre le bloc `with` comme une occurrence de l'étape."""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.monotonic() - started, started)
+    
+    def as_dict(self):
+        """Rapport sérialisable en JSON: compteurs, puis nombre, total et histogramme cumulé par étape."""
+        with self._lock:
+            stages = {}
+            for stage, buckets in self._buckets.items():
+                cumulative = 0
+                histogram = {}
+                for bound, bucket in zip(STAGE_BUCKETS, buckets):
+                    cumulative += bucket
+                    histogram[str(bound)] = cumulative
+                histogram['+Inf'] = self._counts[stage]
+                stages[stage] = {
+                    'count': self._counts[stage],
+                    'seconds': round(self._sums[stage], 6),
+                    'buckets': histogram
+                }
+            return {
+                'started': self.started,
+                'duration': round(time.time() - self.started, 3),
+                'counters': dict(self.counters),
+                'child_usage': self.child_usage._asdict() if self.child_usage else None,
+                'stages': stages
+            }
+    
+    def to_prometheus(self):
+        """Métriques au format texte de Prometheus."""
+        report = self.as_dict()
+        lines = [
+            "# HELP video2audio_stage_seconds Durée des étapes de conversion.",
+            "# TYPE video2audio_stage_seconds histogram"
+        ]
+        for stage, values in report['stages'].items():
+            for bound, cumulative in values['buckets'].items():
+                lines.append(f'video2audio_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'video2audio_stage_seconds_sum{{stage="{stage}"}} {values["seconds"]}')
+            lines.append(f'video2audio_stage_seconds_count{{stage="{stage}"}} {values["count"]}')
+        
+        counters = dict(report['counters'])
+        lines.append("# HELP video2audio_output_bytes_total Taille des fichiers audio produits.")
+        lines.append("# TYPE video2audio_output_bytes_total counter")
+        lines.append(f"video2audio_output_bytes_total {counters.pop('bytes_out', 0)}")
+        lines.append("# HELP video2audio_events_total Conversions et fichiers sautés, par résultat.")
+        lines.append("# TYPE video2audio_events_total counter")
+        for name, value in sorted(counters.items()):
+            lines.append(f'video2audio_events_total{{event="{name}"}} {value}')
+        
+        usage = report['child_usage']
+        if usage:
+            lines.append("# HELP video2audio_child_cpu_seconds_total Temps CPU des processus FFmpeg.")
+            lines.append("# TYPE video2audio_child_cpu_seconds_total counter")
+            lines.append(f'video2audio_child_cpu_seconds_total{{mode="user"}} {usage["user_cpu"]}')
+            lines.append(f'video2audio_child_cpu_seconds_total{{mode="system"}} {usage["system_cpu"]}')
+            lines.append("# HELP video2audio_child_max_rss_bytes Mémoire résidente maximale d'un processus FFmpeg.")
+            lines.append("# TYPE video2audio_child_max_rss_bytes gauge")
+            lines.append(f"video2audio_child_max_rss_bytes {usage['max_rss_kb'] * 1024}")
+            lines.append("# HELP video2audio_child_block_io_total Blocs lus et écrits par les processus FFmpeg.")
+            lines.append("# TYPE video2audio_child_block_io_total counter")
+            lines.append(f'video2audio_child_block_io_total{{direction="in"}} {usage["block_in"]}')
+            lines.append(f'video2audio_child_block_io_total{{direction="out"}} {usage["block_out"]}')
+        
+        lines.append("# HELP video2audio_run_duration_seconds Durée de l'exécution.")
+        lines.append("# TYPE video2audio_run_duration_seconds gauge")
+        lines.append(f"video2audio_run_duration_seconds {report['duration']}")
+        lines.append("# HELP video2audio_run_start_time_seconds Début de l'exécution (horodatage Unix).")
+        lines.append("# TYPE video2audio_run_start_time_seconds gauge")
+        lines.append(f"video2audio_run_start_time_seconds {report['started']}")
+        return "\n".join(lines) + "\n"
+    
+    def write(self, json_path=None, prometheus_path=None):
+        """
+        Enregistre les métriques, chaque fichier étant remplacé d'un coup.
+        
+        Args:
+            json_path (str): Rapport JSON à écrire
+            prometheus_path (str): Fichier .prom à écrire (collecteur textfile)
+        """
+        for path, content in (
+            (json_path, lambda: json.dumps(self.as_dict(), indent=2)),
+            (prometheus_path, self.to_prometheus)
+        ):
+            if not path:
+                continue
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(content())
+            os.replace(tmp_path, path)
+
+def timed(metrics, stage):
+    """Chronomètre une étape si des métriques sont collectées, ne fait rien sinon."""
+    return metrics.time(stage) if metrics is not None else contextlib.nullcontext()
+
+def traced(metrics, name, **args):
+    """
+    Place le bloc `with` sur la chronologie si elle est tenue, ne fait rien sinon.
+    
+    Le dictionnaire produit (None sans chronologie) peut être complété
+    pendant le bloc, par exemple avec le résultat.
+    """
+    if metrics is None or metrics.trace is None:
+        return contextlib.nullcontext()
+    return metrics.trace.span(name, 'job', **args)
+
+def _timed_iter(iterable, metrics, stage):
+    """Chronomètre l'obtention de chaque élément d'un itérable."""
+    if metrics is None:
+        yield from iterable
+        return
+    
+    iterator = iter(iterable)
+    while True:
+        started = time.monotonic()
+        try:
+            item = next(iterator)
+        except StopIteration:
+            return
+        metrics.observe(stage, time.monotonic() - started, started)
+        yield item
+
+def convert_video_to_audio(input_path, output_path, audio_format='mp3', quality='192k', verbose=False,
+                           threads=None, overwrite=False, on_progress=None, metrics=None):
+    """
+    Convertit un fichier vidéo en fichier audio.
+    
+    En format auto, la piste audio est copiée sans réencodage quand son
+    codec le permet, et l'extension du fichier de sortie est remplacée par
+    celle du conteneur choisi.
+    
+    Args:
+        input_path (str): Chemin vers le fichier vidéo d'entrée
+        output_path (str): Chemin vers le fichier audio de sortie
+        audio_format (str): Format de sortie (mp3, wav, auto, etc.)
+        quality (str): Qualité audio (128k, 192k, 256k, 320k)
+        verbose (bool): Mode verbeux
+        threads (ThreadBudget): Threads FFmpeg alloués (défaut: choix de FFmpeg)
+        overwrite (bool): Écraser le fichier de sortie s'il existe
+        on_progress (callable): Appelée avec chaque Progress pendant la conversion
+        metrics (RunMetrics): Métriques à alimenter (durée de chaque étape)
+    
+    Returns:
+        bool: True si la conversion est réussie, False sinon
+    """
+    if not os.path.exists(input_path):
+        logger.error(f"Le fichier d'entrée n'existe pas: {input_path}")
+        return False
+    
+    with traced(metrics, os.path.basename(input_path), input=input_path) as span:
+        if audio_format == 'auto':
+            with timed(metrics, 'probe'):
+                audio_format, extension = resolve_audio_format(input_path, audio_format)
+            output_path = os.path.splitext(output_path)[0] + f".{extension}"
+        
+        outputs = [OutputSpec(output_path, audio_format, quality)]
+        converted = convert_video_to_renditions(
+            input_path, outputs, verbose, threads, overwrite, on_progress, metrics
+        )
+        
+        if metrics is not None:
+            with metrics.time('finalize'):
+                output_size = file_size(output_path) if converted else None
+            metrics.count('converted' if converted else 'failed')
+            metrics.count('bytes_out', output_size or 0)
+        if span is not None:
+            span['converted'] = converted
+    return converted
+
+def convert_video_to_renditions(input_path, outputs, verbose=False, threads=None, overwrite=False,
+                                on_progress=None, metrics=None, on_usage=None):
+    """
+    Produit plusieurs fichiers audio d'une vidéo en un seul passage de FFmpeg.
+    
+    Args:
+        input_path (str): Chemin vers le fichier vidéo d'entrée
+        outputs (list): Sorties à produire (OutputSpec, format déjà résolu)
+        verbose (bool): Mode verbeux
+        threads (ThreadBudget): Threads FFmpeg alloués (défaut: choix de FFmpeg)
+        overwrite (bool): Écraser les fichiers de sortie existants
+        on_progress (callable): Appelée avec chaque Progress pendant la
+            conversion, depuis le thread appelant
+        metrics (RunMetrics): Métriques à alimenter (lancement et encodage)
+        on_usage (callable): Appelée avec les ressources consommées par
+            FFmpeg (ChildUsage)
+    
+    Returns:
+        bool: True si toutes les sorties ont été produites, False sinon
+    """
+    if not os.path.exists(input_path):
+        logger.error(f"Le fichier d'entrée n'existe pas: {input_path}")
+        return False
+    
+    if not outputs:
+        logger.error(f"Aucune piste audio à extraire: {input_path}")
+        return False
+    
+    # S'assurer que les dossiers de sortie existent
+    for output in outputs:
+        os.makedirs(os.path.dirname(output.path) or '.', exist_ok=True)
+    
+    ffmpeg_cmd = build_multi_output_cmd(
+        input_path, outputs, threads, overwrite, on_progress is not None,
+        None if verbose else CAPTURE_LOGLEVEL
+    )
+    
+    # Les sorties présentes avant la conversion ne sont jamais supprimées
+    existing = {output.path for output in outputs if os.path.exists(output.path)}
+    
+    if on_progress is not None:
+        converted = _run_with_progress(ffmpeg_cmd, input_path, outputs, verbose, on_progress, metrics, on_usage)
+    else:
+        # Exécuter la commande
+        # stdin fermé: plusieurs FFmpeg peuvent tourner en parallèle et ne
+        # doivent pas se disputer le terminal
+        if verbose:
+            logger.info(f"Exécution de la commande: {' '.join(ffmpeg_cmd)}")
+        returncode, stderr = run_ffmpeg(ffmpeg_cmd, verbose, metrics, on_usage)
+        converted = returncode == 0
+        if converted:
+            output_names = ', '.join(os.path.basename(output.path) for output in outputs)
+            logger.info(f"Conversion réussie: {os.path.basename(input_path)} -> {output_names}")
+        else:
+            log_ffmpeg_failure(input_path, returncode, stderr)
+    
+    if converted or not any(output.audio_format == 'copy' for output in outputs):
+        return converted
+    
+    # La copie sans réencodage a échoué: encoder, sans changer de fichier de sortie
+    logger.warning(f"Copie de la piste audio impossible, nouvel essai en l'encodant: {input_path}")
+    for output in outputs:
+        if output.path not in existing and os.path.exists(output.path):
+            os.remove(output.path)
+    transcoded = [
+        output._replace(audio_format='transcode') if output.audio_format == 'copy' else output
+        for output in outputs
+    ]
+    return convert_video_to_renditions(
+        input_path, transcoded, verbose, threads, overwrite, on_progress, metrics, on_usage
+    )
+
+def convert_video_group(sources, verbose=False, threads=None, overwrite=False, metrics=None, on_usage=None):
+    """
+    Convertit plusieurs vidéos avec un seul processus FFmpeg.
+    
+    Pour de très courtes vidéos, le lancement de FFmpeg et l'ouverture des
+    codecs coûtent plus que l'encodage: les regrouper amortit ce coût. Un
+    seul fichier illisible fait échouer tout le groupe.
+    
+    Args:
+        sources (list): Couples (chemin de la vidéo, sorties OutputSpec au
+            format déjà résolu)
+        verbose (bool): Mode verbeux
+        threads (ThreadBudget): Threads FFmpeg alloués (défaut: choix de FFmpeg)
+        overwrite (bool): Écraser les fichiers de sortie existants
+        metrics (RunMetrics): Métriques à alimenter (lancement et encodage)
+        on_usage (callable): Appelée avec les ressources consommées par
+            FFmpeg (ChildUsage)
+    
+    Returns:
+        bool: True si toutes les sorties de toutes les vidéos ont été produites
+    """
+    for input_path, outputs in sources:
+        if not os.path.exists(input_path):
+            logger.error(f"Le fichier d'entrée n'existe pas: {input_path}")
+            return False
+        if not outputs:
+            logger.error(f"Aucune piste audio à extraire: {input_path}")
+            return False
+        for output in outputs:
+            os.makedirs(os.path.dirname(output.path) or '.', exist_ok=True)
+    
+    ffmpeg_cmd = build_group_cmd(sources, threads, overwrite, None if verbose else CAPTURE_LOGLEVEL)
+    if verbose:
+        logger.info(f"Exécution de la commande: {' '.join(ffmpeg_cmd)}")
+    returncode, stderr = run_ffmpeg(ffmpeg_cmd, verbose, metrics, on_usage)
+    
+    if returncode != 0:
+        log_ffmpeg_failure(
+            f"groupe de {len(sources)} fichiers ({', '.join(path for path, _ in sources)})", returncode, stderr
+        )
+        #DEL returncode, stderr)
+        return False
+    
+    input_names = ', '.join(os.path.basename(input_path) for input_path, _ in sources)
+    logger.info(f"Conversion groupée réussie: {input_names}")
+    return True
+
+# Ressources consommées par un processus FFmpeg: temps CPU utilisateur et
+# système (secondes), mémoire résidente maximale (Kio), blocs lus et écrits
+ChildUsage = namedtuple('ChildUsage', ['user_cpu', 'system_cpu', 'max_rss_kb', 'block_in', 'block_out'])
+
+def wait_child(process):
+    """
+    Attend la fin d'un processus et relève ses ressources avec os.wait4.
+    
+    Args:
+        process (subprocess.Popen): Processus lancé
+    
+    Returns:
+        tuple: (code de sortie, ChildUsage ou None si indisponible)
+    """
+    if not hasattr(os, 'wait4'):
+        return process.wait(), None
+    
+    try:
+        _, status, rusage = os.wait4(process.pid, 0)
+    except ChildProcessError:
+        # Déjà récupéré ailleurs: seul le code de sortie reste connu
+        return process.wait(), None
+    
+    # Même convention que Popen.returncode: -N si tué par le signal N
+    process.returncode = -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+    # ru_maxrss est en octets sous macOS, en Kio ailleurs
+    max_rss_kb = rusage.ru_maxrss // 1024 if sys.platform == 'darwin' else rusage.ru_maxrss
+    return process.returncode, ChildUsage(
+        round(rusage.ru_utime, 3), round(rusage.ru_stime, 3), max_rss_kb, rusage.ru_inblock, rusage.ru_oublock
+    )
+
+def add_child_usage(total, usage):
+    """Cumule les ressources de deux processus: sommes, et maximum pour la mémoire."""
+    if total is None or usage is None:
+        return total or usage
+    return ChildUsage(
+        round(total.user_cpu + usage.user_cpu, 3),
+        round(total.system_cpu + usage.system_cpu, 3),
+        max(total.max_rss_kb, usage.max_rss_kb),
+        total.block_in + usage.block_in,
+        total.block_out + usage.block_out
+    )
+
+def run_ffmpeg(ffmpeg_cmd, verbose=False, metrics=None, on_usage=None):
+    """
+    Exécute FFmpeg sans entrée standard et sans garder sa sortie standard.
+    
+    Args:
+        ffmpeg_cmd (list): Commande à exécuter
+        verbose (bool): Laisser FFmpeg écrire sur le terminal au lieu de
+            capturer sa sortie d'erreur
+        metrics (RunMetrics): Métriques à alimenter (lancement et encodage)
+        on_usage (callable): Appelée avec le ChildUsage de FFmpeg
+    
+    Returns:
+        tuple: (code de sortie, StderrTail ou None en mode verbeux)
+    """
+    with timed(metrics, 'spawn'):
+        process = subprocess.Popen(
+            ffmpeg_cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=None if verbose else subprocess.DEVNULL,
+            stderr=None if verbose else subprocess.PIPE
+        )
+    
+    stderr = None if verbose else StderrTail()
+    with timed(metrics, 'encode'):
+        try:
+            if stderr is not None:
+                stderr.consume(process.stderr)
+        finally:
+            returncode, usage = wait_child(process)
+    
+    if metrics is not None:
+        metrics.add_usage(usage)
+    if on_usage is not None and usage is not None:
+        on_usage(usage)
+    return returncode, stderr
+
+def _stream_fileno(stream):
+    """Descripteur d'un flux Python, ou None s'il n'en a pas (BytesIO, flux réseau...)."""
+    try:
+        return stream.fileno()
+    except (AttributeError, io.UnsupportedOperation):
+        return None
+
+def _pump(source, destination):
+    """Recopie source dans destination par blocs de PIPE_CHUNK_SIZE."""
+    while True:
+        chunk = source.read(PIPE_CHUNK_SIZE)
+        if not chunk:
+            break
+        destination.write(chunk)
+
+def _feed_stdin(source, stdin):
+    """Alimente l'entrée standard de FFmpeg depuis un flux Python, puis la ferme."""
+    try:
+        _pump(source, stdin)
+    except BrokenPipeError:
+        # FFmpeg s'est arrêté avant la fin du flux: son code de sortie le dira
+        pass
+    finally:
+        try:
+            stdin.close()
+        except BrokenPipeError:
+            pass
+
+def resolve_stream_format(source, audio_format):
+    """
+    Choisit le codec et le muxer diffusable d'une sortie envoyée dans un tube.
+    
+    Args:
+        source (str|file): Chemin de la vidéo, ou flux binaire (non analysable)
+        audio_format (str): Format demandé (mp3, wav ou auto)
+    
+    Returns:
+        tuple: (format pour build_ffmpeg_cmd, muxer FFmpeg)
+    """
+    if audio_format != 'auto':
+        return audio_format, PIPE_MUXERS[audio_format]
+    
+    # Un flux ne peut pas être analysé par FFprobe sans être consommé
+    info = probe_media(source) if isinstance(source, str) else None
+    stream = info.audio_streams[0] if info and info.audio_streams else None
+    muxer = PIPE_MUXERS.get(stream.codec) if stream else None
+    if muxer:
+        return 'copy', muxer
+    
+    logger.debug(f"Piste audio non copiable dans un tube, encodage en {AUTO_FALLBACK_FORMAT}")
+    return AUTO_FALLBACK_FORMAT, PIPE_MUXERS[AUTO_FALLBACK_FORMAT]
+
+def convert_stream(source, destination, audio_format='mp3', quality='192k', verbose=False, threads=None):
+    """
+    Convertit une vidéo lue dans un flux et écrit l'audio dans un flux.
+    
+    Les flux bruts (io.FileIO, sys.stdin.buffer.raw) et les destinations
+    adossées à un descripteur sont passés directement à FFmpeg; les autres
+    flux (BytesIO, réponse HTTP...) sont recopiés par blocs, si
+    bien que la mémoire utilisée reste bornée quelle que soit la taille de la
+    vidéo. Un conteneur dont l'index est en fin de fichier (MP4 non
+    « faststart ») ne peut pas être lu depuis un flux.
+    
+    Args:
+        source (str|file): Chemin de la vidéo ou flux binaire à lire
+        destination (str|file): Chemin du fichier audio ou flux binaire où écrire
+        audio_format (str): Format de sortie (mp3, wav ou auto)
+        quality (str): Qualité audio (128k, 192k, 256k, 320k)
+        verbose (bool): Mode verbeux
+        threads (ThreadBudget): Threads FFmpeg alloués (défaut: choix de FFmpeg)
+    
+    Returns:
+        bool: True si la conversion est réussie, False sinon
+    """
+    if isinstance(source, str) and not os.path.exists(source):
+        logger.error(f"Le fichier d'entrée n'existe pas: {source}")
+        return False
+    
+    if isinstance(destination, str):
+        os.makedirs(os.path.dirname(destination) or '.', exist_ok=True)
+    
+    audio_format, muxer = resolve_stream_format(source, audio_format)
+    input_path = source if isinstance(source, str) else "pipe:0"
+    output_path = destination if isinstance(destination, str) else "pipe:1"
+    ffmpeg_cmd = build_multi_output_cmd(
+        input_path, [OutputSpec(output_path, audio_format, quality, muxer=muxer)], threads,
+        loglevel=None if verbose else CAPTURE_LOGLEVEL
+    )
+    
+    stdin = subprocess.DEVNULL
+    if not isinstance(source, str):
+        # Un flux tamponné a pu lire d'avance au-delà de la position de son
+        # descripteur: seul un fichier brut peut être confié tel quel
+        fd = _stream_fileno(source) if isinstance(source, io.FileIO) else None
+        stdin = fd if fd is not None else subprocess.PIPE
+    
+    stdout = None if verbose else subprocess.DEVNULL
+    if not isinstance(destination, str):
+        fd = _stream_fileno(destination)
+        if fd is not None:
+            # Ce qui est encore dans le tampon Python doit précéder l'audio
+            destination.flush()
+        stdout = fd if fd is not None else subprocess.PIPE
+    
+    if verbose:
+        logger.info(f"Exécution de la commande: {' '.join(ffmpeg_cmd)}")
+    
+    process = subprocess.Popen(
+        ffmpeg_cmd,
+        stdin=stdin,
+        stdout=stdout,
+        stderr=None if verbose else subprocess.PIPE
+    )
+    
+    stderr = None
+    if not verbose:
+        stderr = StderrTail()
+        stderr.start(process.stderr)
+    
+    feeder = None
+    if stdin == subprocess.PIPE:
+        feeder = threading.Thread(target=_feed_stdin, args=(source, process.stdin), daemon=True)
+        feeder.start()
+    
+    try:
+        if stdout == subprocess.PIPE:
+            _pump(process.stdout, destination)
+    finally:
+        if process.stdout:
+            process.stdout.close()
+        returncode = process.wait()
+        if feeder:
+            feeder.join()
+        if stderr:
+            stderr.join()
+    
+    if returncode != 0:
+        log_ffmpeg_failure(input_path, returncode, stderr)
+        return False
+    
+    logger.info(f"Conversion réussie: {input_path} -> {output_path}")
+    return True
+
+def _run_with_progress(ffmpeg_cmd, input_path, outputs, verbose, on_progress, metrics=None, on_usage=None):
+    """Exécute FFmpeg en lisant son avancement (-progress pipe:1) au fil de l'eau."""
+    if verbose:
+        logger.info(f"Exécution de la commande: {' '.join(ffmpeg_cmd)}")
+    
+    with timed(metrics, 'spawn'):
+        process = subprocess.Popen(
+            ffmpeg_cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=None if verbose else subprocess.PIPE
+        )
+    
+    # La sortie standard porte l'avancement: la sortie d'erreur est lue à côté
+    stderr = None
+    if not verbose:
+        stderr = StderrTail()
+        stderr.start(process.stderr)
+    
+    with timed(metrics, 'encode'):
+        try:
+            for update in parse_progress(process.stdout):
+                on_progress(update)
+        finally:
+            process.stdout.close()
+            returncode, usage = wait_child(process)
+            if stderr:
+                stderr.join()
+    
+    if metrics is not None:
+        metrics.add_usage(usage)
+    if on_usage is not None and usage is not None:
+        on_usage(usage)
+    
+    if returncode != 0:
+        log_ffmpeg_failure(input_path, returncode, stderr)
+        return False
+    
+    output_names = ', '.join(os.path.basename(output.path) for output in outputs)
+    logger.info(f"Conversion réussie: {os.path.basename(input_path)} -> {output_names}")
+    return True
+
+# Conversion d'un long fichier découpé en plages encodées en parallèle; le
+# WAV ne coûte presque rien à encoder, le découper ne ferait que multiplier
+# les décodages
+SEGMENT_FORMATS = ('mp3',)
+
+# En deçà, le lancement des processus et l'assemblage coûtent plus qu'ils ne rapportent
+MIN_SEGMENT_SECONDS = 60
+
+# Fréquences d'échantillonnage acceptées par l'encodeur MP3
+MP3_SAMPLE_RATES = (8000, 11025, 12000, 16000, 22050, 24000, 32000, 44100, 48000)
+
+# Trames MP3 encodées en plus de part et d'autre d'une plage, puis
+# écartées à l'assemblage: elles couvrent le délai de l'encodeur et le
+# recouvrement de la MDCT, la première trame gardée est donc complète
+SEGMENT_OVERLAP_FRAMES = 2
+
+# Décodage commencé avant chaque plage, le temps d'amorcer le décodeur
+# (recouvrement des trames AAC, pré-roulage Opus...)
+SEGMENT_PREROLL_SECONDS = 1.0
+
+# Conteneurs (format_name de FFprobe) dont les horodatages audio comptent
+# les échantillons: une plage peut y commencer par une recherche rapide.
+# Ailleurs (Matroska et FLV à la milliseconde, MPEG-TS à 90 kHz...), chaque
+# plage devrait être décodée depuis le début: le fichier est converti d'une traite
+SEGMENT_SEEK_FORMATS = frozenset(('mov,mp4,m4a,3gp,3g2,mj2', 'wav', 'w64', 'aiff', 'ogg', 'flac'))
+
+# Plage d'une conversion découpée, en échantillons: partie gardée
+# [start, end) et partie encodée [encode_start, encode_end), end et
+# encode_end valant None jusqu'à la fin du flux
+Segment = namedtuple('Segment', ['start', 'end', 'encode_start', 'encode_end'])
+
+def mp3_frame_samples(sample_rate):
+    """Échantillons par trame MP3: 1152 en MPEG-1 (32 kHz et plus), 576 en deçà."""
+    return 1152 if sample_rate >= 32000 else 576
+
+def plan_segments(total_samples, count, frame_samples=1, overlap=0):
+    """
+    Découpe un flux en plages contiguës de durées égales.
+    
+    Les limites sont des multiples de `frame_samples`: un assemblage sans
+    réencodage tombe alors exactement entre deux trames.
+    
+    Args:
+        total_samples (int): Nombre d'échantillons du flux (estimé)
+        count (int): Nombre de plages
+        frame_samples (int): Granularité des limites, en échantillons
+        overlap (int): Échantillons encodés en plus avant et après chaque
+            plage, écartés à l'assemblage
+    
+    Returns:
+        list: Plages (Segment) dans l'ordre du flux
+    """
+    step = total_samples / count
+    bounds = [round(step * number / frame_samples) * frame_samples for number in range(count)]
+    # La dernière plage va jusqu'à la fin réelle du flux, quelle que soit la durée annoncée
+    bounds.append(None)
+    
+    segments = []
+    for start, end in zip(bounds, bounds[1:]):
+        segments.append(Segment(
+            start, end, max(0, start - overlap), None if end is None else end + overlap
+        ))
+    return segments
+
+def build_segment_cmd(input_path, part_path, segment, audio_format, quality, sample_rate,
+                      input_rate=None, threads=None, loglevel=None):
+    """
+    Construit la commande FFmpeg qui encode une plage d'un fichier.
+    
+    -ss avant -i fait chercher le démultiplexeur directement près du début
+    de la plage, SEGMENT_PREROLL_SECONDS plus tôt pour que le décodeur soit
+    amorcé. Avec -copyts, les horodatages restent ceux du fichier: atrim
+    coupe la plage sur ces positions (start_pts, end_pts), identiques pour
+    deux plages voisines, si bien que chaque échantillon tombe dans
+    exactement une plage. Le conteneur doit être de SEGMENT_SEEK_FORMATS.
+    
+    Args:
+        input_path (str): Chemin vers le fichier vidéo d'entrée
+        part_path (str): Fichier de la plage encodée
+        segment (Segment): Plage à encoder
+        audio_format (str): Format de sortie (mp3 ou wav)
+        quality (str): Qualité audio (pour MP3)
+        sample_rate (int): Fréquence des échantillons de `segment` et de la sortie
+        input_rate (int): Fréquence de la piste d'entrée, rééchantillonnée à
+            `sample_rate` après la découpe (défaut: `sample_rate`)
+        threads (ThreadBudget): Threads alloués (défaut: choix de FFmpeg)
+        loglevel (str): Niveau des messages de FFmpeg (défaut: celui de FFmpeg)
+    
+    Returns:
+        list: Arguments de la commande FFmpeg
+    """
+    input_rate = input_rate or sample_rate
+    
+    def input_sample(position):
+        return position * input_rate // sample_rate
+    
+    ffmpeg_cmd = ["ffmpeg"]
+    if loglevel:
+        ffmpeg_cmd.extend(["-hide_banner", "-loglevel", loglevel])
+    ffmpeg_cmd.append("-y")
+    
+    if threads and threads.decoder:
+        ffmpeg_cmd.extend(["-threads", str(threads.decoder)])
+    position = max(0.0, segment.encode_start / sample_rate - SEGMENT_PREROLL_SECONDS)
+    if position:
+        # -seek_timestamp: -ss désigne un horodatage du fichier, comme start_pts
+        ffmpeg_cmd.extend(["-seek_timestamp", "1", "-ss", f"{position:.6f}"])
+    ffmpeg_cmd.extend(["-copyts", "-i", input_path, "-vn", "-map", "0:a:0"])
+    
+    trim = []
+    if segment.encode_start:
+        trim.append(f"start_pts={input_sample(segment.encode_start)}")
+    if segment.encode_end is not None:
+        trim.append(f"end_pts={input_sample(segment.encode_end)}")
+    audio_filters = [f"atrim={':'.join(trim)}"] if trim else []
+    audio_filters.append("asetpts=PTS-STARTPTS")
+    if input_rate != sample_rate:
+        audio_filters.append(f"aresample={sample_rate}")
+    ffmpeg_cmd.extend(["-af", ",".join(audio_filters)])
+    
+    if audio_format == 'mp3':
+        # Sans réservoir de bits, chaque trame se décode sans les
+        # précédentes: les plages se recollent sans réencodage
+        ffmpeg_cmd.extend(["-c:a", "libmp3lame", "-b:a", quality, "-reservoir", "0"])
+    else:
+        ffmpeg_cmd.extend(["-c:a", "pcm_s16le"])
+    
+    ffmpeg_cmd.append(part_path)
+    return ffmpeg_cmd
+
+def _concat_quote(path):
+    """Chemin entre apostrophes pour une liste du démultiplexeur concat."""
+    return "'" + path.replace("'", "'\\''") + "'"
+
+def write_concat_list(list_path, parts, sample_rate):
+    """
+    Écrit la liste du démultiplexeur concat qui assemble les plages.
+    
+    inpoint et outpoint écartent les trames encodées en plus de part et
+    d'autre de chaque plage. FFmpeg les lit à la microseconde près: inpoint
+    est arrondi au-dessus et outpoint au-dessous, pour qu'ils restent entre
+    la trame de la limite et sa voisine à écarter (à 44,1 kHz, une limite ne
+    tombe pas sur une microseconde entière).
+    
+    Args:
+        list_path (str): Fichier de liste à écrire
+        parts (list): Couples (fichier de la plage, Segment)
+        sample_rate (int): Fréquence des échantillons des plages
+    """
+    with open(list_path, 'w', encoding='utf-8') as f:
+        f.write("ffconcat version 1.0\n")
+        for part_path, segment in parts:
+            f.write(f"file {_concat_quote(os.path.abspath(part_path))}\n")
+            if segment.start > segment.encode_start:
+                inpoint = -(-(segment.start - segment.encode_start) * 1000000 // sample_rate)
+                f.write(f"inpoint {inpoint / 1000000:.6f}\n")
+            if segment.end is not None and segment.encode_end != segment.end:
+                outpoint = (segment.end - segment.encode_start) * 1000000 // sample_rate
+                f.write(f"outpoint {outpoint / 1000000:.6f}\n")
+
+def convert_segmented(input_path, output_path, audio_format='mp3', quality='192k', segments=None,
+                      verbose=False, overwrite=False, metrics=None):
+    """
+    Convertit un long fichier en encodant plusieurs plages en parallèle.
+    
+    Le fichier est découpé en `segments` plages de durées égales, chacune
+    encodée par son propre processus FFmpeg; les plages sont ensuite
+    assemblées sans réencodage par le démultiplexeur concat. Les limites
+    tombent entre deux trames MP3 et chaque plage est encodée avec quelques
+    trames de plus, écartées à l'assemblage, pour ne laisser ni silence ni clic.
+    
+    Les autres formats, les fichiers trop courts, ceux dont la durée ou la
+    fréquence d'échantillonnage est inconnue et ceux dont le conteneur ne
+    permet pas de chercher un échantillon précis (voir SEGMENT_SEEK_FORMATS)
+    sont convertis d'une traite.
+    
+    Args:
+        input_path (str): Chemin vers le fichier vidéo d'entrée
+        output_path (str): Chemin vers le fichier audio de sortie
+        audio_format (str): Format de sortie (seul mp3 est découpé)
+        quality (str): Qualité audio (pour MP3)
+        segments (int): Nombre de plages (défaut: nombre de CPU)
+        verbose (bool): Mode verbeux
+        overwrite (bool): Écraser le fichier de sortie s'il existe
+        metrics (RunMetrics): Métriques à alimenter (durée de chaque étape)
+    
+    Returns:
+        bool: True si la conversion est réussie, False sinon
+    """
+    if not os.path.exists(input_path):
+        logger.error(f"Le fichier d'entrée n'existe pas: {input_path}")
+        return False
+    
+    def convert_whole(reason):
+        logger.info(f"Conversion d'une traite ({reason}): {input_path}")
+        return convert_video_to_audio(
+            input_path, output_path, audio_format, quality, verbose, overwrite=overwrite, metrics=metrics
+        )
+    
+    if audio_format not in SEGMENT_FORMATS:
+        return convert_whole(f"format {audio_format} non découpable")
+    
+    with timed(metrics, 'probe'):
+        info = probe_media(input_path)
+    stream = info.audio_streams[0] if info and info.audio_streams else None
+    if not info or not info.duration or not stream or not stream.sample_rate:
+        return convert_whole("durée ou fréquence d'échantillonnage inconnue")
+    if info.format_name not in SEGMENT_SEEK_FORMATS:
+        return convert_whole(f"horodatages de {info.format_name} trop imprécis pour y chercher une plage")
+    
+    count = segments or default_jobs()
+    if count < 2:
+        return convert_whole("une seule plage")
+    count = min(count, int(info.duration // MIN_SEGMENT_SECONDS))
+    if count < 2:
+        return convert_whole("fichier trop court pour être découpé")
+    
+    if os.path.exists(output_path) and not overwrite:
+        logger.error(f"Le fichier de sortie existe déjà: {output_path}")
+        return False
+    
+    sample_rate = stream.sample_rate
+    frame_samples, overlap = 1, 0
+    if audio_format == 'mp3':
+        sample_rate = min(MP3_SAMPLE_RATES, key=lambda rate: abs(rate - stream.sample_rate))
+        frame_samples = mp3_frame_samples(sample_rate)
+        overlap = SEGMENT_OVERLAP_FRAMES * frame_samples
+    plan = plan_segments(round(info.duration * sample_rate), count, frame_samples, overlap)
+    
+    threads = plan_thread_budget(len(plan))
+    loglevel = None if verbose else CAPTURE_LOGLEVEL
+    output_dir = os.path.dirname(output_path) or '.'
+    os.makedirs(output_dir, exist_ok=True)
+    # Les plages sont écrites à côté de la sortie: même disque, et le dossier
+    # caché n'est pas pris pour une vidéo par le mode batch
+    parts_dir = tempfile.mkdtemp(prefix='.video2audio-segments-', dir=output_dir)
+    parts = [
+        (os.path.join(parts_dir, f"{number:04d}.{audio_format}"), segment)
+        for number, segment in enumerate(plan)
+    ]
+    
+    def encode_part(part):
+        part_path, segment = part
+        ffmpeg_cmd = build_segment_cmd(
+            input_path, part_path, segment, audio_format, quality, sample_rate,
+            stream.sample_rate, threads, loglevel
+        )
+        if verbose:
+            logger.info(f"Exécution de la commande: {' '.join(ffmpeg_cmd)}")
+        with traced(metrics, os.path.basename(part_path), input=input_path, start=segment.start):
+            returncode, stderr = run_ffmpeg(ffmpeg_cmd, verbose, metrics)
+        if returncode != 0:
+            log_ffmpeg_failure(f"{input_path} (plage {os.path.basename(part_path)})", returncode, stderr)
+        return returncode == 0
+    
+    with traced(metrics, os.path.basename(input_path), input=input_path, segments=len(plan)) as span:
+        try:
+            logger.info(f"Découpage en {len(plan)} plages: {input_path}")
+            with ThreadPoolExecutor(max_workers=len(plan), thread_name_prefix='video2audio-segment') as executor:
+                converted = all(list(executor.map(encode_part, parts)))
+            
+            if converted:
+                list_path = os.path.join(parts_dir, 'concat.txt')
+                write_concat_list(list_path, parts, sample_rate)
+                ffmpeg_cmd = ["ffmpeg"]
+                if loglevel:
+                    ffmpeg_cmd.extend(["-hide_banner", "-loglevel", loglevel])
+                ffmpeg_cmd.extend(["-y", "-f", "concat", "-safe", "0", "-i", list_path, "-c", "copy", output_path])
+                if verbose:
+                    logger.info(f"Exécution de la commande: {' '.join(ffmpeg_cmd)}")
+                with timed(metrics, 'finalize'):
+                    returncode, stderr = run_ffmpeg(ffmpeg_cmd, verbose)
+                if returncode != 0:
+                    log_ffmpeg_failure(f"{input_path} (assemblage des plages)", returncode, stderr)
+                    converted = False
+        finally:
+            shutil.rmtree(parts_dir, ignore_errors=True)
+        
+        if metrics is not None:
+            metrics.count('converted' if converted else 'failed')
+            metrics.count('bytes_out', (file_size(output_path) or 0) if converted else 0)
+        if span is not None:
+            span['converted'] = converted
+    
+    if converted:
+        logger.info(f"Conversion réussie: {os.path.basename(input_path)} -> {os.path.basename(output_path)}")
+    return converted
+
+def parse_rendition(spec):
+    """
+    Lit une déclinaison de sortie de la forme FORMAT[:QUALITÉ] (mp3:128k, wav, auto).
+    
+    Returns:
+        tuple: (format, qualité)
+    
+    Raises:
+        argparse.ArgumentTypeError: Si le format ou la qualité est inconnu
+    """
+    audio_format, _, quality = spec.partition(':')
+    quality = quality or '192k'
+    if audio_format not in AUDIO_FORMATS:
+        raise argparse.ArgumentTypeError(f"format inconnu: {audio_format}")
+    if quality not in AUDIO_QUALITIES:
+        raise argparse.ArgumentTypeError(f"qualité inconnue: {quality}")
+    return audio_format, quality
+
+# Pistes audio à extraire séparément: langues (tags FFprobe) et positions
+# parmi les pistes audio (0 pour la première); None pour ne pas filtrer
+TrackSelection = namedtuple('TrackSelection', ['languages', 'indexes'], defaults=(None, None))
+
+def select_audio_tracks(info, tracks):
+    """
+    Filtre les pistes audio d'une analyse selon une sélection.
+    
+    Returns:
+        list: Couples (position parmi les pistes audio, AudioStream)
+    """
+    selected = []
+    for position, stream in enumerate(info.audio_streams):
+        if tracks.indexes is not None and position not in tracks.indexes:
+            continue
+        if tracks.languages is not None and stream.language not in tracks.languages:
+            continue
+        selected.append((position, stream))
+    return selected
+
+def track_label(position, stream):
+    """Suffixe de nom de fichier d'une piste, tiré de ses tags (fra, eng-commentary...)."""
+    parts = [stream.language, stream.title]
+    label = '-'.join(part for part in parts if part and part != 'und')
+    label = re.sub(r'[^\w.-]+', '_', label).strip('_.').lower()
+    return label or f"piste{position + 1}"
+
+def plan_outputs(input_path, output_stem, renditions, info=None, tracks=None):
+    """
+    Détermine les fichiers produits pour chaque déclinaison d'une vidéo.
+    
+    Le format auto est résolu (une seule analyse pour toutes les
+    déclinaisons). Quand plusieurs déclinaisons partagent une extension,
+    la qualité est ajoutée au nom: sortie-128k.mp3, sortie-320k.mp3.
+    
+    Avec une sélection de pistes, chaque piste retenue est extraite dans
+    ses propres fichiers, nommés d'après ses tags: sortie.fra.mp3,
+    sortie.eng-commentary.mp3.
+    
+    Args:
+        input_path (str): Chemin vers le fichier vidéo
+        output_stem (str): Chemin de sortie sans extension
+        renditions (list): Déclinaisons (format, qualité)
+        info (MediaInfo): Analyse déjà faite, pour le format auto et les pistes
+        tracks (TrackSelection): Pistes à extraire séparément (défaut: la
+            piste choisie par FFmpeg)
+    
+    Returns:
+        tuple: Sorties à produire (OutputSpec), vide si aucune piste ne
+        correspond à la sélection
+    """
+    needs_probe = tracks is not None or any(audio_format == 'auto' for audio_format, _ in renditions)
+    if info is None and needs_probe:
+        info = probe_media(input_path) or UNREADABLE_MEDIA
+    
+    if tracks is None:
+        streams = [(output_stem, None)]
+    else:
+        streams = []
+        labels = Counter()
+        for position, stream in select_audio_tracks(info, tracks):
+            label = track_label(position, stream)
+            labels[label] += 1
+            # Deux pistes avec les mêmes tags: ajouter leur numéro
+            if labels[label] > 1:
+                label = f"{label}-{position + 1}"
+            streams.append((f"{output_stem}.{label}", stream))
+    
+    outputs = []
+    for stem, stream in streams:
+        resolved = [
+            resolve_audio_format(input_path, audio_format, info, stream) + (quality,)
+            for audio_format, quality in renditions
+        ]
+        extensions = Counter(extension for _, extension, _ in resolved)
+        
+        for audio_format, extension, quality in resolved:
+            suffix = f"-{quality}" if extensions[extension] > 1 else ""
+            output = OutputSpec(
+                f"{stem}{suffix}.{extension}", audio_format, quality, stream.index if stream else None
+            )
+            if output.path not in (known.path for known in outputs):
+                outputs.append(output)
+    return tuple(outputs)
+
+def default_jobs():
+    """Nombre de conversions simultanées par défaut (nombre de CPU)."""
+    return os.cpu_count() or 1
+
+# Extensions vidéo courantes (comparées en minuscules)
+VIDEO_EXTENSIONS = frozenset(('.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv', '.webm'))
+
+def find_video_files(input_dir, recursive=False):
+    """
+    Parcourt un dossier et produit ses fichiers vidéo au fur et à mesure.
+    
+    Un seul parcours os.scandir par dossier: l'extension est comparée sans
+    tenir compte de la casse (.mp4, .MP4, .Mp4...), et chaque fichier n'est
+    listé qu'une fois, y compris sur un système de fichiers insensible à la
+    casse.
+    
+    Args:
+        input_dir (str): Chemin du dossier contenant les vidéos
+        recursive (bool): Parcourir aussi les sous-dossiers
+    
+    Yields:
+        str: Chemin de chaque fichier vidéo trouvé
+    """
+    directories = [input_dir]
+    while directories:
+        directory = directories.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file():
+                            if os.path.splitext(entry.name)[1].lower() in VIDEO_EXTENSIONS:
+                                yield entry.path
+                        elif recursive and entry.is_dir(follow_symlinks=False):
+                            directories.append(entry.path)
+                    except OSError:
+                        # Entrée disparue ou illisible pendant le parcours
+                        continue
+        except OSError as e:
+            logger.warning(f"Dossier illisible ignoré: {directory} ({e})")
+
+def output_stem(video_file, input_dir, output_dir):
+    """
+    Chemin de sortie, sans extension, d'une vidéo en mode batch.
+    
+    L'arborescence relative au dossier d'entrée est reproduite dans le
+    dossier de sortie.
+    """
+    relative_path = os.path.relpath(video_file, input_dir)
+    return os.path.join(output_dir, os.path.splitext(relative_path)[0])
+
+def audio_output_path(video_file, input_dir, output_dir, extension):
+    """Chemin du fichier audio produit pour une vidéo en mode batch."""
+    # Remplacer l'extension par celle du format audio souhaité
+    return output_stem(video_file, input_dir, output_dir) + f".{extension}"
+
+# Manifeste du mode incrémental, stocké dans le dossier de sortie
+MANIFEST_NAME = '.video2audio-manifest.json'
+
+def file_size(path):
+    """Taille d'un fichier en octets, ou None s'il n'existe pas."""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return None
+
+def outputs_size(paths):
+    """Taille totale de plusieurs fichiers, ou None si l'un d'eux manque."""
+    sizes = [file_size(path) for path in paths]
+    return None if None in sizes else sum(sizes)
+
+def conversion_options(renditions, tracks=None):
+    """Options qui influencent le contenu des fichiers audio produits."""
+    options = []
+    for audio_format, quality in renditions:
+        option = {'format': audio_format}
+        # La qualité n'a pas d'effet sur le PCM
+        if audio_format != 'wav':
+            option['quality'] = quality
+        options.append(option)
+    
+    if tracks is not None:
+        return {
+            'renditions': options,
+            'tracks': {field: sorted(value) if value is not None else None
+                       for field, value in tracks._asdict().items()},
+        }
+    
+    # Une seule déclinaison: même forme que les manifestes existants
+    return options[0] if len(options) == 1 else options
+
+def load_manifest(output_dir):
+    """
+    Charge le manifeste du mode incrémental.
+    
+    Args:
+        output_dir (str): Dossier de sortie
+    
+    Returns:
+        dict: Entrées du manifeste, indexées par chemin de sortie relatif
+    """
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('entries', {})
+    except FileNotFoundError:
+        return {}
+    except (ValueError, AttributeError) as e:
+        logger.warning(f"Manifeste illisible, tous les fichiers seront reconvertis: {manifest_path} ({e})")
+        return {}
+
+def save_manifest(output_dir, entries):
+    """Écrit le manifeste du mode incrémental de façon atomique."""
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    tmp_path = manifest_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'version': 1, 'entries': entries}, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+def manifest_entry(video_file, options):
+    """Décrit l'état d'une vidéo source tel qu'enregistré dans le manifeste."""
+    stat = os.stat(video_file)
+    return {
+        'source': os.path.abspath(video_file),
+        'mtime_ns': stat.st_mtime_ns,
+        'size': stat.st_size,
+        'options': options
+    }
+
+def is_up_to_date(entry, recorded, output_paths):
+    """
+    Indique si des fichiers audio sont à jour par rapport à leur source.
+    
+    Args:
+        entry (dict): État actuel de la source (voir manifest_entry)
+        recorded (dict): Entrée du manifeste lors de la dernière conversion
+        output_paths (list): Fichiers audio attendus
+    
+    Returns:
+        bool: True si la conversion peut être sautée
+    """
+    if not recorded:
+        return False
+    
+    output_size = outputs_size(output_paths)
+    return (
+        all(recorded.get(key) == value for key, value in entry.items())
+        and output_size is not None
+        and recorded.get('output_size') == output_size
+    )
+
+# Journal des conversions par lots, stocké dans le dossier de sortie
+JOURNAL_NAME = '.video2audio-journal.jsonl'
+
+def open_journal(output_dir, resume=False):
+    """
+    Ouvre le journal des conversions par lots.
+    
+    Le journal est un fichier JSON Lines en ajout seul: chaque ligne
+    enregistre un changement d'état d'une conversion (planned, running,
+    done, failed).
+    
+    Args:
+        output_dir (str): Dossier de sortie
+        resume (bool): Compléter le journal existant au lieu de le recommencer
+    
+    Returns:
+        file: Fichier du journal ouvert en écriture
+    """
+    journal_path = os.path.join(output_dir, JOURNAL_NAME)
+    return open(journal_path, 'a' if resume else 'w', encoding='utf-8')
+
+def journal_event(journal, event, video_file, output_path, **fields):
+    """
+    Ajoute un événement au journal.
+    
+    Les fins de conversion sont forcées sur disque: après un redémarrage
+    de la machine, une conversion terminée n'est pas refaite.
+    """
+    record = {'event': event, 'input': video_file, 'output': output_path, 'time': time.time()}
+    record.update(fields)
+    journal.write(json.dumps(record) + '\n')
+    journal.flush()
+    if event in ('done', 'failed'):
+        os.fsync(journal.fileno())
+
+def replay_journal(output_dir):
+    """
+    Relit le journal et retourne le dernier état connu de chaque sortie.
+    
+    Args:
+        output_dir (str): Dossier de sortie
+    
+    Returns:
+        dict: Dernier événement enregistré, indexé par fichier de sortie
+    """
+    journal_path = os.path.join(output_dir, JOURNAL_NAME)
+    states = {}
+    try:
+        with open(journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Dernière ligne tronquée par l'interruption
+                    continue
+                states[record['output']] = record
+    except FileNotFoundError:
+        pass
+    return states
+
+# Conversion planifiée en mode batch: les sorties (OutputSpec) ont leur format
+# déjà résolu, la première sert de clé dans le journal et le manifeste, et
+# l'entrée du manifeste n'est renseignée qu'en mode incrémental
+# duration: durée de la vidéo en secondes, si elle a été analysée
+BatchJob = namedtuple('BatchJob', ['input_path', 'outputs', 'entry', 'duration'], defaults=(None,))
+
+def plan_batch_jobs(input_dir, output_dir, renditions, recursive=False, manifest=None,
+                    states=None, skipped=None, tracks=None, durations=False, metrics=None):
+    """
+    Produit les conversions à faire au fur et à mesure de la découverte.
+    
+    Args:
+        input_dir (str): Chemin du dossier contenant les vidéos
+        output_dir (str): Chemin du dossier de sortie
+        renditions (list): Déclinaisons à produire (format, qualité)
+        recursive (bool): Parcourir aussi les sous-dossiers
+        manifest (dict): Manifeste du mode incrémental (None: désactivé)
+        states (dict): États rejoués du journal pour une reprise (None: désactivé)
+        skipped (Counter): Compte les fichiers sautés ('up_to_date', 'resumed')
+        tracks (TrackSelection): Pistes audio à extraire séparément
+        durations (bool): Analyser chaque vidéo pour connaître sa durée
+        metrics (RunMetrics): Métriques à alimenter (découverte et analyse)
+    
+    Yields:
+        BatchJob: Conversion à faire, format auto résolu
+    """
+    options = conversion_options(renditions, tracks)
+    
+    video_files = _timed_iter(find_video_files(input_dir, recursive), metrics, 'discover')
+    if durations or tracks is not None or any(audio_format == 'auto' for audio_format, _ in renditions):
+        # Analyses en parallèle, en avance sur la planification
+        discovered = probe_many(video_files, metrics=metrics)
+    else:
+        discovered = ((video_file, None) for video_file in video_files)
+    
+    for video_file, info in discovered:
+        outputs = plan_outputs(
+            video_file, output_stem(video_file, input_dir, output_dir), renditions, info or UNREADABLE_MEDIA,
+            tracks
+        )
+        if not outputs:
+            logger.warning(f"Aucune piste audio correspondant à la sélection: {video_file}")
+            continue
+        output_paths = [output.path for output in outputs]
+        output_path = output_paths[0]
+        
+        entry = None
+        if manifest is not None:
+            try:
+                entry = manifest_entry(video_file, options)
+            except OSError:
+                # Fichier supprimé entre la découverte et le stat
+                continue
+            if is_up_to_date(entry, manifest.get(os.path.relpath(output_path, output_dir)), output_paths):
+                if skipped is not None:
+                    skipped['up_to_date'] += 1
+                continue
+        
+        if states is not None:
+            state = states.get(output_path, {})
+            output_size = outputs_size(output_paths)
+            if state.get('event') == 'done' and output_size is not None \
+                    and output_size == state.get('output_size'):
+                if skipped is not None:
+                    skipped['resumed'] += 1
+                continue
+            if state.get('event') == 'running':
+                for path in output_paths:
+                    if os.path.exists(path):
+                        logger.info(f"Suppression de la sortie partielle: {path}")
+                        os.remove(path)
+        
+        yield BatchJob(video_file, outputs, entry, info.duration if info else None)
+
+# Avancement global d'un lot: fichiers terminés et planifiés, secondes
+# d'audio produites et connues, vitesse globale par rapport au temps réel et
+# temps restant estimé (None tant qu'ils sont inconnus)
+BatchStatus = namedtuple(
+    'BatchStatus', ['files_done', 'files_planned', 'audio_done', 'audio_total', 'speed', 'eta']
+)
+
+class BatchProgress:
+    """
+    Agrège l'avancement des conversions d'un lot, depuis plusieurs threads.
+    
+    La vitesse est le total des secondes d'audio produites par seconde
+    écoulée depuis le début du lot, toutes conversions confondues; le temps
+    restant en découle pour la durée d'audio restante. Les vidéos dont la
+    durée est inconnue comptent dans la vitesse mais pas dans le restant.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._files_done = 0
+        self._files_planned = 0
+        self._audio_total = 0.0
+        self._audio_finished = 0.0
+        self._processed_finished = 0.0
+        self._running = {}
+    
+    def planned(self, job):
+        """Compte une conversion planifiée."""
+        with self._lock:
+            self._files_planned += 1
+            self._audio_total += job.duration or 0.0
+    
+    def update(self, job, progress):
+        """Enregistre l'avancement d'une conversion en cours."""
+        if progress.out_time is None:
+            return
+        with self._lock:
+            self._running[job.input_path] = (progress.out_time, job.duration)
+    
+    def finished(self, job, converted=True):
+        """
+        Compte une conversion terminée, réussie ou non.
+        
+        Seul l'audio réellement produit compte dans la vitesse: la dernière
+        position annoncée, à défaut la durée de la vidéo si elle a été
+        convertie. Un échec rapide ne gonfle ni la vitesse ni le débit.
+        """
+        with self._lock:
+            produced = (job.duration or 0.0) if converted else 0.0
+            out_time, _ = self._running.pop(job.input_path, (produced, None))
+            self._files_done += 1
+            self._audio_finished += job.duration or 0.0
+            self._processed_finished += out_time
+    
+    def processed(self):
+        """Secondes d'audio produites depuis le début du lot, conversions en cours comprises."""
+        with self._lock:
+            return self._processed_finished + sum(out_time for out_time, _ in self._running.values())
+    
+    def snapshot(self):
+        """
+        Returns:
+            BatchStatus: Avancement global à cet instant
+        """
+        with self._lock:
+            processed = self._processed_finished + sum(out_time for out_time, _ in self._running.values())
+            audio_done = self._audio_finished + sum(
+                min(out_time, duration) for out_time, duration in self._running.values() if duration
+            )
+            elapsed = time.monotonic() - self._started
+            speed = processed / elapsed if processed and elapsed else None
+            eta = None
+            if speed:
+                eta = max(0.0, self._audio_total - audio_done) / speed
+            return BatchStatus(
+                self._files_done, self._files_planned, audio_done, self._audio_total or None, speed, eta
+            )
+
+def log_batch_status(status):
+    """Affiche l'avancement d'un lot en une ligne."""
+    speed = f"{status.speed:.1f}x" if status.speed else "?"
+    logger.info(
+        f"Progression: {status.files_done}/{status.files_planned} fichiers, "
+        f"{format_duration(status.audio_done)} / {format_duration(status.audio_total)} d'audio, "
+        f"{speed} temps réel, reste {format_duration(status.eta)}"
+    )
+
+# Politiques d'ordonnancement d'un lot
+SCHEDULE_POLICIES = ('fifo', 'lpt', 'sjf')
+
+# Coût relatif, par seconde de vidéo, du décodage (une fois par vidéo) et de
+# l'encodage de chaque sortie selon son format
+DECODE_COST = 0.3
+ENCODE_COSTS = {
+    'mp3': 1.0,
+    'wav': 0.15,
+    'copy': 0.05
+}
+
+# Débit supposé d'une vidéo dont la durée est inconnue (octets par seconde)
+FALLBACK_BYTES_PER_SECOND = 250_000
+
+def estimate_job_cost(job):
+    """
+    Estime le coût d'une conversion, en secondes de vidéo pondérées.
+    
+    La durée analysée sert de base, à défaut la taille du fichier; elle est
+    pondérée par le décodage et par l'encodage de chaque sortie.
+    
+    Args:
+        job (BatchJob): Conversion à estimer
+    
+    Returns:
+        float: Coût relatif, comparable entre conversions
+    """
+    seconds = job.duration
+    if seconds is None:
+        seconds = (file_size(job.input_path) or 0) / FALLBACK_BYTES_PER_SECOND
+    weight = DECODE_COST + sum(ENCODE_COSTS.get(output.audio_format, 1.0) for output in job.outputs)
+    return seconds * weight
+
+def schedule_jobs(job_source, policy='fifo'):
+    """
+    Ordonne les conversions d'un lot.
+    
+    fifo garde l'ordre de découverte et commence aussitôt. lpt (les plus
+    longues d'abord) minimise la durée totale: une longue vidéo ne reste
+    pas seule en fin de lot. sjf (les plus courtes d'abord) termine le plus
+    de fichiers le plus tôt. lpt et sjf attendent la fin de la découverte
+    et gardent toutes les conversions en mémoire.
+    
+    Args:
+        job_source (iterable): Conversions à faire (BatchJob)
+        policy (str): fifo, lpt ou sjf
+    
+    Yields:
+        BatchJob: Conversions dans l'ordre choisi
+    """
+    if policy == 'fifo':
+        yield from job_source
+        return
+    
+    if policy not in SCHEDULE_POLICIES:
+        raise ValueError(f"Politique d'ordonnancement inconnue: {policy}")
+    
+    planned = [(estimate_job_cost(job), job) for job in job_source]
+    planned.sort(key=lambda item: item[0], reverse=policy == 'lpt')
+    logger.debug(f"Ordonnancement {policy}: {len(planned)} conversions")
+    for _, job in planned:
+        yield job
+
+class ConcurrencyLimit:
+    """
+    Nombre de conversions autorisées à tourner en même temps, modifiable en
+    cours de lot.
+    
+    Les threads de conversion prennent une place avant chaque conversion et
+    la rendent après. Baisser la limite n'interrompt aucune conversion: les
+    nouvelles attendent que les conversions en cours repassent sous la limite.
+    
+    Args:
+        limit (int): Limite initiale
+    """
+    
+    def __init__(self, limit):
+        self._condition = threading.Condition()
+        self.limit = limit
+        self.active = 0
+    
+    def acquire(self, stop):
+        """Attend une place libre; retourne False si le lot est arrêté entre-temps."""
+        with self._condition:
+            while self.active >= self.limit:
+                if stop.is_set():
+                    return False
+                self._condition.wait(0.1)
+            self.active += 1
+            return True
+    
+    def release(self):
+        """Rend une place."""
+        with self._condition:
+            self.active -= 1
+            self._condition.notify()
+    
+    def set_limit(self, limit):
+        """Change la limite; les threads en attente la réévaluent aussitôt."""
+        with self._condition:
+            self.limit = limit
+            self._condition.notify_all()
+
+# Réglage du contrôleur de concurrence adaptatif (--adaptive-jobs): période
+# de mesure (secondes), gain minimal de débit pour continuer à monter,
+# périodes stables avant de retenter une conversion de plus, facteur de
+# recul, iowait et charge par cœur au-delà desquels les disques ou le
+# processeur sont saturés
+ADAPTIVE_INTERVAL = 10.0
+ADAPTIVE_MIN_GAIN = 0.05
+ADAPTIVE_PROBE_PERIODS = 3
+ADAPTIVE_BACKOFF = 0.5
+ADAPTIVE_MAX_IOWAIT = 0.3
+ADAPTIVE_MAX_LOAD = 1.5
+
+def read_cpu_times():
+    """
+    Temps CPU cumulés de la machine, d'après /proc/stat (Linux).
+    
+    Returns:
+        tuple: (temps d'attente des entrées-sorties, temps total), en
+        tops d'horloge, ou None si /proc/stat est illisible
+    """
+    try:
+        with open('/proc/stat', encoding='ascii') as f:
+            fields = f.readline().split()
+    except OSError:
+        return None
+    if not fields or fields[0] != 'cpu' or len(fields) < 6:
+        return None
+    # user nice system idle iowait irq softirq steal...; guest et guest_nice
+    # sont déjà comptés dans user et nice
+    times = [int(value) for value in fields[1:9]]
+    return times[4], sum(times)
+
+def load_per_cpu():
+    """Charge moyenne sur une minute par cœur, ou None si elle est indisponible."""
+    try:
+        return os.getloadavg()[0] / (os.cpu_count() or 1)
+    except (AttributeError, OSError):
+        return None
+
+class AdaptiveConcurrency:
+    """
+    Ajuste le nombre de conversions simultanées d'un lot (AIMD).
+    
+    À chaque période, le débit du lot (secondes d'audio produites par
+    seconde) est comparé à celui de la période précédente. Tant qu'une
+    conversion de plus le fait progresser, la limite monte d'une unité;
+    quand il plafonne, la dernière hausse est annulée; quand il baisse, ou
+    que les disques (iowait) ou le processeur (charge) saturent, la limite
+    est divisée (ADAPTIVE_BACKOFF). Après un recul, la période suivante ne
+    sert que de nouvelle référence. Après ADAPTIVE_PROBE_PERIODS périodes
+    sans changement, une conversion de plus est retentée: le point optimal
+    est ainsi retrouvé même quand il change en cours de lot.
+    
+    Args:
+        limiter (ConcurrencyLimit): Limite à piloter
+        tracker (BatchProgress): Avancement du lot, source du débit
+        max_jobs (int): Limite maximale (nombre de threads de conversion)
+        interval (float): Période de mesure, en secondes
+    """
+    
+    def __init__(self, limiter, tracker, max_jobs, interval=ADAPTIVE_INTERVAL):
+        self.limiter = limiter
+        self.tracker = tracker
+        self.max_jobs = max_jobs
+        self.interval = interval
+        self._last_time = time.monotonic()
+        self._last_processed = tracker.processed()
+        self._last_cpu = read_cpu_times()
+        self._last_throughput = None
+        self._raised = False
+        # La première période mesurée sert de référence, puis une hausse est tentée aussitôt
+        self._stable = ADAPTIVE_PROBE_PERIODS
+    
+    def tick(self):
+        """Mesure la période écoulée et ajuste la limite si elle est complète."""
+        now = time.monotonic()
+        elapsed = now - self._last_time
+        if elapsed < self.interval:
+            return
+        
+        processed = self.tracker.processed()
+        throughput = (processed - self._last_processed) / elapsed
+        cpu = read_cpu_times()
+        iowait = None
+        if cpu and self._last_cpu and cpu[1] > self._last_cpu[1]:
+            iowait = (cpu[0] - self._last_cpu[0]) / (cpu[1] - self._last_cpu[1])
+        load = load_per_cpu()
+        self._last_time, self._last_processed, self._last_cpu = now, processed, cpu
+        
+        limit = self.limiter.limit
+        previous, self._last_throughput = self._last_throughput, throughput
+        saturated = (iowait is not None and iowait >= ADAPTIVE_MAX_IOWAIT) \
+            or (load is not None and load >= ADAPTIVE_MAX_LOAD)
+        
+        if saturated or (previous and throughput < previous * (1 - ADAPTIVE_MIN_GAIN)):
+            # Recul multiplicatif; le débit de la période suivante, mesuré à
+            # la nouvelle limite, sert de référence et non de baisse
+            new_limit = max(1, int(limit * ADAPTIVE_BACKOFF))
+            self._last_throughput = None
+            self._stable = 0
+        elif previous is None:
+            new_limit = limit
+        elif self._raised:
+            if throughput > previous * (1 + ADAPTIVE_MIN_GAIN):
+                # Montée additive tant que le débit progresse
+                new_limit = min(self.max_jobs, limit + 1)
+            else:
+                # Plateau: la dernière conversion ajoutée n'a rien apporté
+                new_limit = max(1, limit - 1)
+                self._stable = 0
+        else:
+            # Limite stable: retenter une conversion de plus de temps en temps
+            self._stable += 1
+            new_limit = limit
+            if self._stable >= ADAPTIVE_PROBE_PERIODS:
+                new_limit = min(self.max_jobs, limit + 1)
+                self._stable = 0
+        self._raised = new_limit > limit
+        
+        if new_limit != limit:
+            self.limiter.set_limit(new_limit)
+            iowait_text = f"{iowait:.0%}" if iowait is not None else "?"
+            load_text = f"{load:.2f}" if load is not None else "?"
+            logger.info(
+                f"Concurrence: {limit} -> {new_limit} conversions "
+                f"({throughput:.1f}x temps réel, charge {load_text} par cœur, iowait {iowait_text})"
+            )
+
+# Durée maximale (secondes) d'une vidéo convertie avec d'autres par un même FFmpeg
+GROUP_MAX_SECONDS = 30
+
+def _put_until(job_queue, item, stop):
+    """Place un élément dans une file bornée, sauf si le lot est arrêté."""
+    while not stop.is_set():
+        try:
+            job_queue.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def run_conversion_jobs(job_source, output_dir, verbose=False, jobs=None,
+                        overwrite=False, manifest=None, append_journal=False, interruptible=False,
+                        on_progress=None, tracker=None, report_interval=None, metrics=None,
+                        group_size=None, group_max_duration=GROUP_MAX_SECONDS, adaptive=False):
+    """
+    Exécute des conversions en parallèle à mesure qu'elles sont produites.
+    
+    Un thread consomme `job_source` et alimente une file bornée que les
+    threads de conversion vident aussitôt: la découverte et les conversions
+    se chevauchent, et la mémoire reste constante quelle que soit la taille
+    de la source. Chaque conversion reçoit un budget de threads FFmpeg
+    adapté au nombre de fichiers restants.
+    
+    Avec `group_size`, les vidéos courtes sont converties par groupes d'un
+    seul processus FFmpeg (convert_video_group); si un groupe échoue, ses
+    vidéos sont reconverties une à une pour isoler le fichier en cause.
+    
+    Avec `adaptive`, `jobs` threads sont lancés mais le nombre de
+    conversions simultanées est piloté par AdaptiveConcurrency, en partant
+    de la moitié de `jobs`.
+    
+    Args:
+        job_source (iterable): Conversions à faire (BatchJob)
+        output_dir (str): Dossier de sortie, qui contient le journal
+        verbose (bool): Mode verbeux
+        jobs (int): Nombre de conversions simultanées (défaut: nombre de CPU)
+        overwrite (bool): Écraser les fichiers de sortie existants
+        manifest (dict): Manifeste du mode incrémental à mettre à jour
+        append_journal (bool): Compléter le journal au lieu de le recommencer
+        interruptible (bool): Un Ctrl-C termine proprement au lieu de
+            propager KeyboardInterrupt
+        on_progress (callable): Appelée avec (BatchJob, Progress) pendant
+            chaque conversion, depuis les threads de conversion
+        tracker (BatchProgress): Avancement global à tenir à jour (créé si
+            report_interval est donné)
+        report_interval (float): Afficher l'avancement global toutes les
+            report_interval secondes
+        metrics (RunMetrics): Métriques à alimenter (lancement, encodage et
+            finalisation de chaque conversion)
+        group_size (int): Nombre de vidéos courtes converties par un même
+            FFmpeg (défaut: une seule)
+        group_max_duration (float): Durée maximale, en secondes, d'une vidéo
+            regroupée; celles dont la durée est inconnue ne le sont jamais
+        adaptive (bool): Ajuster le nombre de conversions simultanées au
+            débit mesuré, `jobs` devenant le maximum
+    
+    Returns:
+        tuple: (nombre de succès, nombre d'échecs)
+    
+    Raises:
+        Exception: L'erreur qui a interrompu le parcours de `job_source`,
+            relancée après la fin des conversions déjà lancées
+    """
+    jobs = max(1, jobs or default_jobs())
+    if tracker is None and (report_interval or adaptive):
+        tracker = BatchProgress()
+    
+    limiter = controller = None
+    if adaptive:
+        limiter = ConcurrencyLimit(max(1, jobs // 2))
+        controller = AdaptiveConcurrency(limiter, tracker, jobs)
+        logger.info(
+            f"Démarrage de la conversion par lots: {limiter.limit} conversions en parallèle, "
+            f"ajustées entre 1 et {jobs}"
+        )
+    else:
+        logger.info(f"Démarrage de la conversion par lots: {jobs} conversions en parallèle")
+    
+    journal = open_journal(output_dir, append_journal)
+    journal_lock = threading.Lock()
+    
+    def record(event, video_file, output_path, **fields):
+        with journal_lock:
+            journal_event(journal, event, video_file, output_path, **fields)
+    
+    # Deux fichiers en attente par thread de conversion
+    job_queue = queue.Queue(maxsize=2 * jobs)
+    results = queue.Queue()
+    stop = threading.Event()
+    progress = {'planned': 0, 'started': 0, 'discovered': False}
+    progress_lock = threading.Lock()
+    # Erreur de la découverte, relancée une fois les conversions en cours terminées
+    discovery_errors = []
+    
+    def discover():
+        # Vidéos courtes en attente d'un groupe complet
+        pending = []
+        try:
+            for job in job_source:
+                record('planned', job.input_path, job.outputs[0].path)
+                if tracker is not None:
+                    tracker.planned(job)
+                if group_size and job.duration is not None and job.duration <= group_max_duration:
+                    pending.append(job)
+                    if len(pending) < group_size:
+                        continue
+                    item, pending = pending, []
+                else:
+                    item = job
+                with progress_lock:
+                    progress['planned'] += 1
+                if not _put_until(job_queue, item, stop):
+                    return
+            if pending:
+                with progress_lock:
+                    progress['planned'] += 1
+                _put_until(job_queue, pending if len(pending) > 1 else pending[0], stop)
+        except Exception as e:
+            logger.error(f"Erreur lors de la découverte des fichiers à convertir: {e}")
+            discovery_errors.append(e)
+        finally:
+            with progress_lock:
+                progress['discovered'] = True
+            for _ in range(jobs):
+                _put_until(job_queue, None, stop)
+    
+    def convert_job(job, threads):
+        video_file, output_path = job.input_path, job.outputs[0].path
+        
+        def job_progress(update):
+            if tracker is not None:
+                tracker.update(job, update)
+            if on_progress is not None:
+                on_progress(job, update)
+        
+        record('running', video_file, output_path)
+        started = time.monotonic()
+        usages = []
+        with traced(metrics, os.path.basename(video_file), input=video_file) as span:
+            try:
+                converted = convert_video_to_renditions(
+                    video_file, job.outputs, verbose, threads, overwrite,
+                    job_progress if on_progress is not None or tracker is not None else None,
+                    metrics, usages.append
+                )
+            except Exception:
+                logger.exception(f"Erreur inattendue pour {video_file}")
+                converted = False
+            if span is not None:
+                span['converted'] = converted
+        results.put((
+            job, converted, round(time.monotonic() - started, 3), usages[0] if usages else None
+        ))
+    
+    def convert_group(group, threads):
+        for job in group:
+            record('running', job.input_path, job.outputs[0].path)
+        # Les sorties présentes avant le groupe ne sont jamais supprimées
+        existing = {output.path for job in group for output in job.outputs if os.path.exists(output.path)}
+        started = time.monotonic()
+        usages = []
+        with traced(metrics, f"groupe de {len(group)}", inputs=[job.input_path for job in group]) as span:
+            try:
+                converted = convert_video_group(
+                    [(job.input_path, job.outputs) for job in group], verbose, threads, overwrite,
+                    metrics, usages.append
+                )
+            except Exception:
+                logger.exception(f"Erreur inattendue pour le groupe de {len(group)} fichiers")
+                converted = False
+            if span is not None:
+                span['converted'] = converted
+        
+        if not converted:
+            logger.warning(f"Échec du groupe de {len(group)} fichiers, reprise fichier par fichier")
+            if metrics is not None:
+                metrics.count('group_fallback')
+            for job in group:
+                for output in job.outputs:
+                    if output.path not in existing and os.path.exists(output.path):
+                        os.remove(output.path)
+            for job in group:
+                if stop.is_set():
+                    return
+                convert_job(job, threads)
+            return
+        
+        # Durée répartie entre les vidéos; les ressources du processus
+        # commun ne sont comptées qu'une fois, avec la première
+        duration = round((time.monotonic() - started) / len(group), 3)
+        usage = usages[0] if usages else None
+        for position, job in enumerate(group):
+            results.put((job, True, duration, usage if position == 0 else None))
+    
+    def work():
+        try:
+            while True:
+                if limiter is not None and not limiter.acquire(stop):
+                    return
+                try:
+                    item = job_queue.get()
+                    if item is None or stop.is_set():
+                        return
+                    
+                    # Une fois la découverte finie, les derniers fichiers se
+                    # partagent toute la machine
+                    with progress_lock:
+                        progress['started'] += 1
+                        concurrent = limiter.limit if limiter is not None else jobs
+                        if progress['discovered']:
+                            concurrent = min(concurrent, progress['planned'] - progress['started'] + 1)
+                    threads = plan_thread_budget(concurrent)
+                    
+                    if isinstance(item, list):
+                        convert_group(item, threads)
+                    else:
+                        convert_job(item, threads)
+                finally:
+                    if limiter is not None:
+                        limiter.release()
+        finally:
+            results.put(None)
+    
+    # Threads démons: une interruption ne doit pas attendre la fin du parcours
+    pipeline = [threading.Thread(target=discover, name='video2audio-discover', daemon=True)]
+    pipeline += [
+        threading.Thread(target=work, name=f'video2audio-worker-{i}', daemon=True) for i in range(jobs)
+    ]
+    for thread in pipeline:
+        thread.start()
+    
+    success_count = 0
+    failure_count = 0
+    batch_usage = None
+    running_workers = jobs
+    
+    # Réveil périodique pour l'affichage de l'avancement et le contrôleur
+    wakeups = [interval for interval in (report_interval, controller and controller.interval) if interval]
+    wakeup = min(wakeups) if wakeups else None
+    
+    # Les compteurs et le manifeste ne sont modifiés que dans ce thread
     try:
-        subprocess.run(
-            ["ffmpeg", "-version"], 
-            stdout=subprocess.PIPE, 
-            stderr=subprocess.PIPE,
-            check=True
+        last_report = time.monotonic()
+        while running_workers:
+            try:
+                result = results.get(timeout=wakeup)
+            except queue.Empty:
+                result = False
+            if report_interval and time.monotonic() - last_report >= report_interval:
+                log_batch_status(tracker.snapshot())
+                last_report = time.monotonic()
+            if controller is not None:
+                controller.tick()
+            if result is False:
+                continue
+            if result is None:
+                running_workers -= 1
+                continue
+            
+            job, converted, duration, usage = result
+            batch_usage = add_child_usage(batch_usage, usage)
+            usage_fields = usage._asdict() if usage else {}
+            if tracker is not None:
+                tracker.finished(job, converted)
+            video_file, output_path = job.input_path, job.outputs[0].path
+            with timed(metrics, 'finalize'):
+                if converted:
+                    success_count += 1
+                    output_size = outputs_size(output.path for output in job.outputs)
+                    record('done', video_file, output_path, duration=duration, output_size=output_size,
+                           **usage_fields)
+                    if manifest is not None:
+                        manifest[os.path.relpath(output_path, output_dir)] = dict(job.entry, output_size=output_size)
+                else:
+                    failure_count += 1
+                    output_size = None
+                    record('failed', video_file, output_path, duration=duration, **usage_fields)
+            if metrics is not None:
+                metrics.count('converted' if converted else 'failed')
+                metrics.count('bytes_out', output_size or 0)
+    except KeyboardInterrupt:
+        if not interruptible:
+            raise
+        logger.info("Interruption demandée, arrêt des conversions")
+    finally:
+        # En cas d'interruption, ne plus lancer de nouvelle conversion
+        stop.set()
+        with journal_lock:
+            journal.close()
+        # Sauvegarder le travail fait, même en cas d'interruption
+        if manifest is not None:
+            save_manifest(output_dir, manifest)
+    
+    if batch_usage is not None:
+        logger.info(
+            f"Ressources FFmpeg: CPU {batch_usage.user_cpu:.1f} s utilisateur, "
+            f"{batch_usage.system_cpu:.1f} s système, mémoire max {batch_usage.max_rss_kb // 1024} Mio, "
+            f"{batch_usage.block_in} blocs lus, {batch_usage.block_out} blocs écrits"
+        )
+    
+    # Des fichiers n'ont jamais été découverts: le lot n'est pas un succès
+    if discovery_errors:
+        raise discovery_errors[0]
+    
+    return success_count, failure_count
+
+def batch_convert(input_dir, output_dir, audio_format='mp3', quality='192k', verbose=False, jobs=None,
+                  incremental=False, resume=False, recursive=False, renditions=None, tracks=None,
+                  progress_interval=None, on_progress=None, metrics=None, schedule='fifo', group_small=None,
+                  adaptive_jobs=False):
+    """
+    Convertit tous les fichiers vidéo d'un dossier en fichiers audio.
+    
+    Les conversions commencent dès les premiers fichiers découverts (voir
+    run_conversion_jobs).
+    
+    Args:
+        input_dir (str): Chemin du dossier contenant les vidéos
+        output_dir (str): Chemin du dossier où sauvegarder les fichiers audio
+        audio_format (str): Format de sortie audio
+        quality (str): Qualité audio
+        verbose (bool): Mode verbeux
+        jobs (int): Nombre de conversions simultanées (défaut: nombre de CPU)
+        incremental (bool): Ne reconvertir que les fichiers absents ou
+            périmés (source, taille ou options modifiées depuis le manifeste)
+        resume (bool): Reprendre un lot interrompu d'après son journal: les
+            conversions terminées sont sautées, les sorties partielles
+            supprimées et refaites
+        recursive (bool): Parcourir aussi les sous-dossiers, dont
+            l'arborescence est reproduite dans le dossier de sortie
+        renditions (list): Déclinaisons (format, qualité) produites en un
+            seul passage par vidéo (défaut: audio_format et quality)
+        tracks (TrackSelection): Extraire chaque piste audio retenue dans
+            ses propres fichiers (défaut: la piste choisie par FFmpeg)
+        progress_interval (float): Afficher l'avancement global (vitesse,
+            temps restant) toutes les progress_interval secondes
+        on_progress (callable): Appelée avec (BatchJob, Progress) pendant
+            chaque conversion
+        metrics (RunMetrics): Métriques à alimenter (durée de chaque étape,
+            conversions et fichiers sautés)
+        schedule (str): Ordre des conversions (fifo, lpt ou sjf, voir
+            schedule_jobs)
+        group_small (int): Convertir les vidéos de moins de GROUP_MAX_SECONDS
+            secondes par groupes de group_small avec un seul FFmpeg
+        adaptive_jobs (bool): Ajuster le nombre de conversions simultanées
+            au débit mesuré, jusqu'à `jobs` (voir AdaptiveConcurrency)
+    
+    Returns:
+        tuple: (nombre de succès, nombre d'échecs)
+    """
+    # S'assurer que les chemins se terminent par un séparateur
+    input_dir = os.path.join(input_dir, '')
+    output_dir = os.path.join(output_dir, '')
+    
+    # Créer le dossier de sortie s'il n'existe pas
+    os.makedirs(output_dir, exist_ok=True)
+    
+    manifest = load_manifest(output_dir) if incremental else None
+    states = replay_journal(output_dir) if resume else None
+    skipped = Counter()
+    renditions = renditions or [(audio_format, quality)]
+    
+    success_count, failure_count = run_conversion_jobs(
+        schedule_jobs(
+            plan_batch_jobs(
+                input_dir, output_dir, renditions, recursive, manifest, states, skipped, tracks,
+                durations=bool(progress_interval) or schedule != 'fifo' or bool(group_small), metrics=metrics
+            ),
+            schedule
+        ),
+        output_dir, verbose, jobs,
+        overwrite=incremental or resume, manifest=manifest, append_journal=resume,
+        on_progress=on_progress, report_interval=progress_interval, metrics=metrics, group_size=group_small,
+        adaptive=adaptive_jobs
+    )
+    
+    if metrics is not None:
+        for reason, count in skipped.items():
+            metrics.count(f'skipped_{reason}', count)
+    
+    if skipped['up_to_date']:
+        logger.info(f"Mode incrémental: {skipped['up_to_date']} fichiers déjà à jour")
+    if skipped['resumed']:
+        logger.info(f"Reprise: {skipped['resumed']} fichiers déjà convertis")
+    if not success_count and not failure_count and not sum(skipped.values()):
+        logger.warning(f"Aucun fichier vidéo trouvé dans {input_dir}")
+    
+    logger.info(f"Conversion par lots terminée. Succès: {success_count}, Échecs: {failure_count}")
+    return success_count, failure_count
+
+class ConversionResult:
+    """
+    Résultat d'une conversion faite par Converter.
+    
+    Attributes:
+        input_path (str): Fichier vidéo converti
+        output_path (str): Fichier audio produit (extension résolue en mode auto)
+        returncode (int): Code de sortie de FFmpeg, None s'il n'a pas été lancé
+        duration (float): Durée de la conversion en secondes
+        audio_seconds (float): Durée d'audio traitée selon FFmpeg, si connue
+        bytes_in (int): Taille du fichier vidéo
+        bytes_out (int): Taille du fichier audio produit
+        error (str): Dernière ligne d'erreur de FFmpeg ou cause de l'échec
+        usage (ChildUsage): Ressources consommées par FFmpeg, si relevées
+    """
+    
+    __slots__ = ('input_path', 'output_path', 'returncode', 'duration', 'audio_seconds',
+                 'bytes_in', 'bytes_out', 'error', 'usage')
+    
+    def __init__(self, input_path, output_path, returncode=None, duration=0.0, audio_seconds=None,
+                 bytes_in=None, bytes_out=None, error=None, usage=None):
+        self.input_path = input_path
+        self.output_path = output_path
+        self.returncode = returncode
+        self.duration = duration
+        self.audio_seconds = audio_seconds
+        self.bytes_in = bytes_in
+        self.bytes_out = bytes_out
+        self.error = error
+        self.usage = usage
+    
+    @property
+    def ok(self):
+        """True si FFmpeg a produit le fichier audio."""
+        return self.returncode == 0
+    
+    @property
+    def realtime_factor(self):
+        """Secondes d'audio traitées par seconde de conversion."""
+        if not self.audio_seconds or not self.duration:
+            return None
+        return self.audio_seconds / self.duration
+    
+    def as_dict(self):
+        """Résultat sous forme de dictionnaire sérialisable en JSON."""
+        result = {name: getattr(self, name) for name in self.__slots__}
+        result['usage'] = self.usage._asdict() if self.usage else None
+        result['realtime_factor'] = self.realtime_factor
+        return result
+    
+    def __repr__(self):
+        return (f"ConversionResult({self.input_path!r}, {self.output_path!r}, "
+                f"returncode={self.returncode}, duration={self.duration:.3f})")
+
+# Dernière position affichée par FFmpeg dans ses statistiques (time=HH:MM:SS.cc)
+_FFMPEG_TIME = re.compile(r'time=(\d+):(\d{2}):(\d{2}(?:\.\d+)?)')
+
+def _ffmpeg_time(stderr):
+    """Durée d'audio traitée d'après les dernières lignes de FFmpeg (StderrTail), ou None."""
+    for line in reversed(stderr.lines):
+        match = _FFMPEG_TIME.search(line)
+        if match:
+            hours, minutes, seconds = match.groups()
+            return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+    return None
+
+# Emplacements de l'entrée et de la sortie dans un modèle de commande
+_INPUT_SLOT = object()
+_OUTPUT_SLOT = object()
+
+class Converter:
+    """
+    Convertisseur configuré une fois, pour les services qui enchaînent les
+    conversions.
+    
+    La présence de FFmpeg n'est vérifiée qu'une fois, la commande de chaque
+    format est préparée une fois, et chaque dossier de sortie n'est créé
+    qu'une fois. Chaque conversion retourne un ConversionResult plutôt que
+    d'écrire dans les logs. Un Converter peut être partagé entre threads.
+    
+    Args:
+        audio_format (str): Format de sortie (mp3, wav ou auto)
+        quality (str): Qualité audio (128k, 192k, 256k, 320k)
+        threads (ThreadBudget): Threads FFmpeg par conversion (défaut: choix de FFmpeg)
+        overwrite (bool): Écraser les fichiers de sortie existants
+    """
+    
+    def __init__(self, audio_format='mp3', quality='192k', threads=None, overwrite=True):
+        self.audio_format = audio_format
+        self.quality = quality
+        self.threads = threads
+        self.overwrite = overwrite
+        
+        self._ffmpeg_available = None
+        self._templates = {}
+        self._directories = set()
+    
+    def _template(self, audio_format):
+        """Commande préparée pour un format résolu, avec la position de l'entrée et de la sortie."""
+        template = self._templates.get(audio_format)
+        if template is None:
+            ffmpeg_cmd = build_multi_output_cmd(
+                _INPUT_SLOT, [OutputSpec(_OUTPUT_SLOT, audio_format, self.quality)], self.threads, self.overwrite,
+                loglevel=CAPTURE_LOGLEVEL
+            )
+            template = (ffmpeg_cmd, ffmpeg_cmd.index(_INPUT_SLOT), ffmpeg_cmd.index(_OUTPUT_SLOT))
+            self._templates[audio_format] = template
+        return template
+    
+    def convert(self, input_path, output_path):
+        """
+        Convertit un fichier vidéo en fichier audio.
+        
+        Args:
+            input_path (str): Chemin vers le fichier vidéo d'entrée
+            output_path (str): Chemin vers le fichier audio de sortie
+        
+        Returns:
+            ConversionResult: Mesures et statut de la conversion
+        """
+        started = time.monotonic()
+        
+        if self._ffmpeg_available is None:
+            self._ffmpeg_available = check_ffmpeg([self.audio_format])
+        if not self._ffmpeg_available:
+            return ConversionResult(input_path, output_path, error="FFmpeg introuvable")
+        
+        # La taille sert aussi de test d'existence: un seul appel système
+        try:
+            bytes_in = os.stat(input_path).st_size
+        except OSError as e:
+            return ConversionResult(input_path, output_path, duration=time.monotonic() - started,
+                                    error=e.strerror)
+        
+        audio_format = self.audio_format
+        if audio_format == 'auto':
+            audio_format, extension = resolve_audio_format(input_path, audio_format)
+            output_path = os.path.splitext(output_path)[0] + f".{extension}"
+        
+        directory = os.path.dirname(output_path) or '.'
+        if directory not in self._directories:
+            os.makedirs(directory, exist_ok=True)
+            self._directories.add(directory)
+        
+        template, input_index, output_index = self._template(audio_format)
+        ffmpeg_cmd = list(template)
+        ffmpeg_cmd[input_index] = input_path
+        ffmpeg_cmd[output_index] = output_path
+        
+        existed = audio_format == 'copy' and os.path.exists(output_path)
+        usages = []
+        returncode, stderr = run_ffmpeg(ffmpeg_cmd, on_usage=usages.append)
+        
+        if returncode != 0 and audio_format == 'copy':
+            # La copie sans réencodage a échoué: encoder, sans changer de fichier de sortie
+            if not existed and os.path.exists(output_path):
+                os.remove(output_path)
+            ffmpeg_cmd = build_multi_output_cmd(
+                input_path, [OutputSpec(output_path, 'transcode', self.quality)], self.threads, self.overwrite,
+                loglevel=CAPTURE_LOGLEVEL
+            )
+            usages = []
+            returncode, stderr = run_ffmpeg(ffmpeg_cmd, on_usage=usages.append)
+        
+        ok = returncode == 0
+        return ConversionResult(
+            input_path,
+            output_path,
+            returncode,
+            time.monotonic() - started,
+            _ffmpeg_time(stderr),
+            bytes_in,
+            file_size(output_path) if ok else None,
+            None if ok else stderr.summary(),
+            usages[0] if usages else None
         )
-        return True
-    except (subprocess.SubprocessError, FileNotFoundError):
-        logger.error("FFmpeg n'est pas installé ou n'est pas dans le PATH.")
-        logger.error("Veuillez installer FFmpeg: https://ffmpeg.org/download.html")
-        return False
+    
+    def convert_many(self, tasks, jobs=None):
+        """
+        Convertit des fichiers en parallèle, dans l'ordre où ils sont fournis.
+        
+        Args:
+            tasks (iterable): Couples (chemin vidéo, chemin audio), éventuellement sans fin
+            jobs (int): Nombre de conversions simultanées (défaut: nombre de CPU)
+        
+        Yields:
+            ConversionResult: Résultat de chaque conversion
+        """
+        jobs = max(1, jobs or default_jobs())
+        window = deque()
+        
+        with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix='video2audio-convert') as executor:
+            for input_path, output_path in tasks:
+                window.append(executor.submit(self.convert, input_path, output_path))
+                if len(window) >= 2 * jobs:
+                    yield window.popleft().result()
+            while window:
+                yield window.popleft().result()
+    
+    def convert_dir(self, input_dir, output_dir, recursive=False, jobs=None):
+        """
+        Convertit toutes les vidéos d'un dossier, en reproduisant son arborescence.
+        
+        Args:
+            input_dir (str): Dossier contenant les fichiers vidéo
+            output_dir (str): Dossier où enregistrer les fichiers audio
+            recursive (bool): Parcourir aussi les sous-dossiers
+            jobs (int): Nombre de conversions simultanées (défaut: nombre de CPU)
+        
+        Yields:
+            ConversionResult: Résultat de chaque conversion
+        """
+        # En mode auto, convert() remplace l'extension par celle du conteneur choisi
+        tasks = (
+            (video_file, audio_output_path(video_file, input_dir, output_dir, self.audio_format))
+            for video_file in find_video_files(input_dir, recursive)
+        )
+        return self.convert_many(tasks, jobs)
+
+# Constantes inotify (linux/inotify.h)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+_INOTIFY_EVENT = struct.Struct('iIII')
 
-def convert_video_to_audio(input_path, output_path, audio_format='mp3', quality='192k', verbose=False):
+def _open_inotify():
+    """Ouvre une instance inotify via ctypes, ou retourne None si indisponible."""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        fd = libc.inotify_init1(IN_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+    return libc, fd
+
+def _inotify_events(libc, fd, input_dir, recursive, tick):
     """
-    Convertit un fichier vidéo en fichier audio.
+    Produit les fichiers créés ou déplacés dans le dossier surveillé.
+    
+    Produit None au moins toutes les `tick` secondes pour que l'appelant
+    puisse vérifier les fichiers en cours d'écriture. Un débordement de la
+    file du noyau est signalé par le chemin du dossier surveillé.
+    """
+    watches = {}
+    
+    def add_watch(directory):
+        mask = IN_CLOSE_WRITE | IN_MOVED_TO | (IN_CREATE if recursive else 0)
+        wd = libc.inotify_add_watch(fd, os.fsencode(directory), mask)
+        if wd < 0:
+            logger.warning(f"Impossible de surveiller {directory}: {os.strerror(ctypes.get_errno())}")
+            return
+        watches[wd] = directory
+    
+    try:
+        add_watch(input_dir)
+        if recursive:
+            for root, dirs, _ in os.walk(input_dir):
+                for name in dirs:
+                    add_watch(os.path.join(root, name))
+        
+        while True:
+            ready, _, _ = select.select([fd], [], [], tick)
+            if not ready:
+                yield None
+                continue
+            
+            data = os.read(fd, 64 * 1024)
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _INOTIFY_EVENT.unpack_from(data, offset)
+                raw_name = data[offset + _INOTIFY_EVENT.size:offset + _INOTIFY_EVENT.size + length]
+                offset += _INOTIFY_EVENT.size + length
+                
+                if mask & IN_Q_OVERFLOW:
+                    logger.warning("File d'événements inotify saturée, nouveau parcours du dossier")
+                    yield input_dir
+                    continue
+                
+                directory = watches.get(wd)
+                if directory is None:
+                    continue
+                path = os.path.join(directory, os.fsdecode(raw_name.rstrip(b'\0')))
+                
+                if mask & IN_ISDIR:
+                    # Nouveau sous-dossier: le surveiller et signaler son contenu
+                    if recursive and mask & (IN_CREATE | IN_MOVED_TO):
+                        add_watch(path)
+                        yield path
+                elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                    yield path
+    finally:
+        os.close(fd)
+
+def _poll_events(input_dir, poll_interval, tick):
+    """Équivalent de _inotify_events par scrutation périodique du dossier."""
+    next_scan = time.monotonic() + poll_interval
+    while True:
+        time.sleep(min(tick, max(0, next_scan - time.monotonic())))
+        if time.monotonic() >= next_scan:
+            next_scan = time.monotonic() + poll_interval
+            yield input_dir
+        else:
+            yield None
+
+def watch_video_files(input_dir, recursive=False, settle=2.0, poll_interval=5.0):
+    """
+    Surveille un dossier et produit chaque nouveau fichier vidéo.
+    
+    Utilise inotify sous Linux, et une scrutation périodique sinon. Un
+    fichier n'est produit qu'une fois que sa taille n'a pas changé pendant
+    `settle` secondes, pour ne pas convertir une copie en cours. Les
+    fichiers déjà présents au démarrage sont ignorés.
+    
+    Args:
+        input_dir (str): Dossier à surveiller
+        recursive (bool): Surveiller aussi les sous-dossiers
+        settle (float): Délai de stabilité de la taille, en secondes
+        poll_interval (float): Intervalle de scrutation sans inotify, en secondes
+    
+    Yields:
+        str: Chemin de chaque nouveau fichier vidéo prêt à être converti
+    """
+    def signature(path):
+        stat = os.stat(path)
+        return stat.st_size, stat.st_mtime_ns
+    
+    def scan(directory):
+        for video_file in find_video_files(directory, recursive):
+            try:
+                yield video_file, signature(video_file)
+            except OSError:
+                continue
+    
+    # Fichiers déjà traités (ou présents au démarrage), avec leur signature
+    known = dict(scan(input_dir))
+    tick = min(1.0, settle)
+    
+    inotify = _open_inotify()
+    if inotify:
+        events = _inotify_events(*inotify, input_dir, recursive, tick)
+    else:
+        logger.info(f"inotify indisponible, scrutation du dossier toutes les {poll_interval} s")
+        events = _poll_events(input_dir, poll_interval, tick)
+    
+    # Fichiers en cours d'écriture: chemin -> (taille, instant du dernier changement)
+    candidates = {}
+    
+    for path in events:
+        now = time.monotonic()
+        
+        if path is not None and os.path.isdir(path):
+            # Nouveau dossier ou parcours complet: retrouver les fichiers modifiés
+            for video_file, sig in scan(path):
+                if known.get(video_file) != sig:
+                    candidates.setdefault(video_file, (None, now))
+        elif path is not None and os.path.splitext(path)[1].lower() in VIDEO_EXTENSIONS:
+            candidates.setdefault(path, (None, now))
+        
+        for candidate, (size, since) in list(candidates.items()):
+            current_size = file_size(candidate)
+            if current_size is None:
+                del candidates[candidate]
+            elif current_size != size:
+                candidates[candidate] = (current_size, now)
+            elif now - since >= settle:
+                del candidates[candidate]
+                try:
+                    sig = signature(candidate)
+                except OSError:
+                    continue
+                if known.get(candidate) != sig:
+                    known[candidate] = sig
+                    yield candidate
+
+def watch_folder(input_dir, output_dir, audio_format='mp3', quality='192k', verbose=False, jobs=None,
+                 recursive=False, settle=2.0, renditions=None, tracks=None):
+    """
+    Mode dossier surveillé: convertit chaque nouvelle vidéo dès son arrivée.
+    
+    Tourne jusqu'à un Ctrl-C. Les conversions passent par les mêmes threads
+    et le même journal que le mode batch; un fichier qui réapparaît sous le
+    même nom écrase l'ancienne sortie.
+    
+    Args:
+        input_dir (str): Dossier à surveiller
+        output_dir (str): Chemin du dossier où sauvegarder les fichiers audio
+        audio_format (str): Format de sortie audio
+        quality (str): Qualité audio
+        verbose (bool): Mode verbeux
+        jobs (int): Nombre de conversions simultanées (défaut: nombre de CPU)
+        recursive (bool): Surveiller aussi les sous-dossiers
+        settle (float): Délai de stabilité de la taille avant conversion, en secondes
+        renditions (list): Déclinaisons (format, qualité) produites en un
+            seul passage par vidéo (défaut: audio_format et quality)
+        tracks (TrackSelection): Pistes audio à extraire séparément
+    
+    Returns:
+        tuple: (nombre de succès, nombre d'échecs)
+    """
+    input_dir = os.path.join(input_dir, '')
+    output_dir = os.path.join(output_dir, '')
+    os.makedirs(output_dir, exist_ok=True)
+    renditions = renditions or [(audio_format, quality)]
+    
+    def new_jobs():
+        for video_file in watch_video_files(input_dir, recursive, settle):
+            logger.info(f"Nouveau fichier détecté: {video_file}")
+            outputs = plan_outputs(
+                video_file, output_stem(video_file, input_dir, output_dir), renditions, tracks=tracks
+            )
+            if not outputs:
+                logger.warning(f"Aucune piste audio correspondant à la sélection: {video_file}")
+                continue
+            yield BatchJob(video_file, outputs, None)
+    
+    logger.info(f"Surveillance de {input_dir} (Ctrl-C pour arrêter)")
+    success_count, failure_count = run_conversion_jobs(
+        new_jobs(), output_dir, verbose, jobs,
+        overwrite=True, append_journal=True, interruptible=True
+    )
+    
+    logger.info(f"Surveillance terminée. Succès: {success_count}, Échecs: {failure_count}")
+    return success_count, failure_count
+
+async def convert_async(input_path, output_path, audio_format='mp3', quality='192k', verbose=False,
+                        threads=None, semaphore=None):
+    """
+    Version asynchrone de convert_video_to_audio().
+    
+    FFmpeg est lancé avec asyncio.create_subprocess_exec: aucun thread n'est
+    bloqué pendant la conversion. Si la tâche est annulée, le processus
+    FFmpeg est tué et le fichier partiel supprimé.
     
     Args:
         input_path (str): Chemin vers le fichier vidéo d'entrée
@@ -49,67 +3387,103 @@ def convert_video_to_audio(input_path, output_path, audio_format='mp3', quality=
         audio_format (str): Format de sortie (mp3, wav, etc.)
         quality (str): Qualité audio (128k, 192k, 256k, 320k)
         verbose (bool): Mode verbeux
+        threads (ThreadBudget): Threads FFmpeg alloués (défaut: choix de FFmpeg)
+        semaphore (asyncio.Semaphore): Limite le nombre de conversions simultanées
     
     Returns:
         bool: True si la conversion est réussie, False sinon
     """
+    if semaphore is None:
+        return await _convert_async(input_path, output_path, audio_format, quality, verbose, threads)
+    
+    async with semaphore:
+        return await _convert_async(input_path, output_path, audio_format, quality, verbose, threads)
+
+async def resolve_audio_format_async(input_path, audio_format):
+    """Version asynchrone de resolve_audio_format(), FFprobe compris."""
+    if audio_format != 'auto':
+        return audio_format, audio_format
+    
+    path = os.path.abspath(input_path)
+    cache = get_probe_cache()
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return resolve_audio_format(input_path, audio_format, UNREADABLE_MEDIA)
+    
+    info = _cached_probe(cache, path, stat)
+    if info is None:
+        process = await asyncio.create_subprocess_exec(
+            *build_ffprobe_cmd(path),
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        stdout, _ = await process.communicate()
+        info = parse_ffprobe_output(stdout) if process.returncode == 0 else UNREADABLE_MEDIA
+        _store_probe(cache, path, stat, info)
+    
+    return resolve_audio_format(input_path, audio_format, info)
+
+async def _convert_async(input_path, output_path, audio_format, quality, verbose, threads):
+    """Exécute une conversion asynchrone (voir convert_async)."""
     if not os.path.exists(input_path):
         logger.error(f"Le fichier d'entrée n'existe pas: {input_path}")
         return False
     
-    # S'assurer que le dossier de sortie existe
-    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    if audio_format == 'auto':
+        audio_format, extension = await resolve_audio_format_async(input_path, audio_format)
+        output_path = os.path.splitext(output_path)[0] + f".{extension}"
     
-    # Préparer les options FFmpeg
-    ffmpeg_cmd = [
-        "ffmpeg",
-        "-i", input_path,
-        "-vn"  # Supprime la piste vidéo
-    ]
+    os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+    output_existed = os.path.exists(output_path)
     
-    # Ajouter les options en fonction du format
-    if audio_format == 'mp3':
-        ffmpeg_cmd.extend([
-            "-c:a", "libmp3lame",
-            "-b:a", quality
-        ])
-    elif audio_format == 'wav':
-        ffmpeg_cmd.extend([
-            "-c:a", "pcm_s16le"
-        ])
-    else:
-        ffmpeg_cmd.extend([
-            "-c:a", "copy"  # Essayer de copier le codec audio tel quel
-        ])
+    ffmpeg_cmd = build_ffmpeg_cmd(input_path, output_path, audio_format, quality, threads)
+    if verbose:
+        logger.info(f"Exécution de la commande: {' '.join(ffmpeg_cmd)}")
     
-    # Ajouter le fichier de sortie
-    ffmpeg_cmd.append(output_path)
+    output = None if verbose else asyncio.subprocess.DEVNULL
+    process = await asyncio.create_subprocess_exec(
+        *ffmpeg_cmd,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=output,
+        stderr=output
+    )
     
-    # Exécuter la commande
     try:
-        if verbose:
-            logger.info(f"Exécution de la commande: {' '.join(ffmpeg_cmd)}")
-            result = subprocess.run(ffmpeg_cmd, check=True)
-        else:
-            result = subprocess.run(
-                ffmpeg_cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                check=True
-            )
-        
-        logger.info(f"Conversion réussie: {os.path.basename(input_path)} -> {os.path.basename(output_path)}")
-        return True
+        returncode = await process.wait()
+    except asyncio.CancelledError:
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        # Ne supprimer que ce que FFmpeg a commencé à écrire
+        if not output_existed and os.path.exists(output_path):
+            os.remove(output_path)
+        logger.warning(f"Conversion annulée: {os.path.basename(input_path)}")
+        raise
     
-    except subprocess.CalledProcessError as e:
-        logger.error(f"Erreur lors de la conversion: {e}")
-        if verbose and e.stderr:
-            logger.error(f"Détails: {e.stderr.decode('utf-8', errors='replace')}")
-        return False
+    if returncode != 0:
+        log_ffmpeg_failure(input_path, returncode, None)
+        if audio_format != 'copy':
+            return False
+        # La copie sans réencodage a échoué: encoder, sans changer de fichier de sortie
+        logger.warning(f"Copie de la piste audio impossible, nouvel essai en l'encodant: {input_path}")
+        if not output_existed and os.path.exists(output_path):
+            os.remove(output_path)
+        return await _convert_async(input_path, output_path, 'transcode', quality, verbose, threads)
+    
+    logger.info(f"Conversion réussie: {os.path.basename(input_path)} -> {os.path.basename(output_path)}")
+    return True
 
-def batch_convert(input_dir, output_dir, audio_format='mp3', quality='192k', verbose=False):
+async def batch_convert_async(input_dir, output_dir, audio_format='mp3', quality='192k', verbose=False,
+                              jobs=None, semaphore=None, recursive=False):
     """
-    Convertit tous les fichiers vidéo d'un dossier en fichiers audio.
+    Générateur asynchrone de conversion par lots.
+    
+    Produit les résultats dans l'ordre où les conversions se terminent.
+    Seule une fenêtre de tâches est créée à la fois pour que la mémoire
+    reste constante quelle que soit la taille du dossier. Fermer le
+    générateur annule les conversions en cours.
     
     Args:
         input_dir (str): Chemin du dossier contenant les vidéos
@@ -117,49 +3491,88 @@ def batch_convert(input_dir, output_dir, audio_format='mp3', quality='192k', ver
         audio_format (str): Format de sortie audio
         quality (str): Qualité audio
         verbose (bool): Mode verbeux
+        jobs (int): Nombre de conversions simultanées (défaut: nombre de CPU)
+        semaphore (asyncio.Semaphore): Sémaphore partagé avec d'autres
+            conversions (défaut: un sémaphore de `jobs` places)
+        recursive (bool): Parcourir aussi les sous-dossiers
     
-    Returns:
-        tuple: (nombre de succès, nombre d'échecs)
+    Yields:
+        tuple: (fichier vidéo, fichier audio ou None si erreur inattendue, succès)
     """
-    # S'assurer que les chemins se terminent par un séparateur
-    input_dir = os.path.join(input_dir, '')
-    output_dir = os.path.join(output_dir, '')
+    jobs = max(1, jobs or default_jobs())
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(jobs)
+    threads = plan_thread_budget(jobs)
     
-    # Créer le dossier de sortie s'il n'existe pas
     os.makedirs(output_dir, exist_ok=True)
+    pending = find_video_files(input_dir, recursive)
+    tasks = {}
     
-    # Extensions vidéo courantes
-    video_extensions = ('*.mp4', '*.avi', '*.mov', '*.mkv', '*.wmv', '*.flv', '*.webm')
+    async def convert_one(video_file):
+        job_format, extension = await resolve_audio_format_async(video_file, audio_format)
+        output_path = audio_output_path(video_file, input_dir, output_dir, extension)
+        converted = await convert_async(
+            video_file, output_path, job_format, quality, verbose, threads, semaphore
+        )
+        return output_path, converted
     
-    # Trouver tous les fichiers vidéo
-    video_files = []
-    for ext in video_extensions:
-        video_files.extend(glob.glob(os.path.join(input_dir, ext)))
-        # Ajout des extensions en majuscules
-        video_files.extend(glob.glob(os.path.join(input_dir, ext.upper())))
+    def schedule():
+        # Deux tâches par place: la suivante est prête dès qu'une place se libère
+        for video_file in pending:
+            tasks[asyncio.ensure_future(convert_one(video_file))] = video_file
+            if len(tasks) >= 2 * jobs:
+                break
     
-    if not video_files:
-        logger.warning(f"Aucun fichier vidéo trouvé dans {input_dir}")
-        return 0, 0
+    try:
+        schedule()
+        while tasks:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                video_file = tasks.pop(task)
+                try:
+                    output_path, converted = task.result()
+                except Exception:
+                    logger.exception(f"Erreur inattendue pour {video_file}")
+                    output_path, converted = None, False
+                yield video_file, output_path, converted
+            schedule()
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+def progress_reporter(input_path, interval):
+    """
+    Callback d'avancement qui affiche la conversion d'un fichier toutes les
+    `interval` secondes.
     
-    logger.info(f"Démarrage de la conversion par lots: {len(video_files)} fichiers trouvés")
+    Args:
+        input_path (str): Fichier converti, analysé pour connaître sa durée
+        interval (float): Intervalle entre deux affichages, en secondes
     
-    success_count = 0
-    failure_count = 0
+    Returns:
+        callable: À passer comme on_progress
+    """
+    info = probe_media(input_path)
+    total = info.duration if info else None
+    last_report = [time.monotonic()]
     
-    for video_file in video_files:
-        # Remplacer l'extension par le format audio souhaité
-        base_name = os.path.basename(video_file)
-        output_name = os.path.splitext(base_name)[0] + f".{audio_format}"
-        output_path = os.path.join(output_dir, output_name)
+    def report(progress):
+        now = time.monotonic()
+        if progress.ended or now - last_report[0] < interval:
+            return
+        last_report[0] = now
         
-        if convert_video_to_audio(video_file, output_path, audio_format, quality, verbose):
-            success_count += 1
-        else:
-            failure_count += 1
+        done = progress.out_time or 0.0
+        percent = f" ({100 * done / total:.0f}%)" if total else ""
+        speed = f"{progress.speed:.1f}x" if progress.speed else "?"
+        eta = (total - done) / progress.speed if total and progress.speed else None
+        logger.info(
+            f"Progression: {format_duration(done)} / {format_duration(total)}{percent}, "
+            f"{speed} temps réel, reste {format_duration(eta)}"
+        )
     
-    logger.info(f"Conversion par lots terminée. Succès: {success_count}, Échecs: {failure_count}")
-    return success_count, failure_count
+    return report
 
 def parse_arguments():
     """Parse les arguments de ligne de commande."""
@@ -171,35 +3584,171 @@ def parse_arguments():
     parser.add_argument(
         "-i", "--input", 
         required=True,
-        help="Chemin vers le fichier vidéo ou le dossier (en mode batch)"
+        help="Chemin vers le fichier vidéo ou le dossier (en mode batch), - pour l'entrée standard"
     )
     
     parser.add_argument(
         "-o", "--output", 
         required=True,
-        help="Chemin de sortie pour le fichier audio ou le dossier (en mode batch)"
+        help="Chemin de sortie pour le fichier audio ou le dossier (en mode batch), - pour la sortie standard"
     )
     
     parser.add_argument(
         "-f", "--format", 
-        choices=["mp3", "wav"], 
+        choices=AUDIO_FORMATS, 
         default="mp3",
-        help="Format de sortie audio"
+        help="Format de sortie audio (auto: copie la piste audio sans réencodage quand son codec le permet)"
+    )
+    
+    parser.add_argument(
+        "--lossless-extract",
+        dest="format",
+        action="store_const",
+        const="auto",
+        help="Équivalent de --format auto"
     )
     
     parser.add_argument(
         "-q", "--quality", 
-        choices=["128k", "192k", "256k", "320k"], 
+        choices=AUDIO_QUALITIES, 
         default="192k",
         help="Qualité audio (pour MP3)"
     )
     
+    parser.add_argument(
+        "--rendition",
+        dest="renditions",
+        action="append",
+        type=parse_rendition,
+        metavar="FORMAT[:QUALITÉ]",
+        help="Déclinaison à produire (ex: mp3:128k, wav), répétable; "
+             "toutes sont produites en un seul passage de FFmpeg et remplacent -f et -q"
+    )
+    
+    parser.add_argument(
+        "--all-tracks",
+        action="store_true",
+        help="Extrait chaque piste audio dans ses propres fichiers, nommés d'après ses tags"
+    )
+    
+    parser.add_argument(
+        "--track-language",
+        action="append",
+        metavar="LANGUE",
+        help="Avec --all-tracks, ne garde que les pistes de cette langue (ex: fra), répétable"
+    )
+    
+    parser.add_argument(
+        "--track-index",
+        action="append",
+        type=int,
+        metavar="N",
+        help="Avec --all-tracks, ne garde que la N-ième piste audio (0 pour la première), répétable"
+    )
+    
     parser.add_argument(
         "-b", "--batch", 
         action="store_true", 
         help="Active le mode de traitement par lots"
     )
     
+    parser.add_argument(
+        "-j", "--jobs",
+        type=int,
+        default=default_jobs(),
+        help="Nombre de conversions simultanées (en mode batch)"
+    )
+    
+    parser.add_argument(
+        "--segments",
+        type=int,
+        nargs="?",
+        const=0,
+        metavar="N",
+        help="Pour un seul long fichier mp3, encode N plages en parallèle puis les assemble "
+             "(nombre de CPU si N est omis)"
+    )
+    
+    parser.add_argument(
+        "--adaptive-jobs",
+        action="store_true",
+        help="En mode batch, ajuste le nombre de conversions simultanées au débit mesuré, "
+             "à la charge et à l'attente des disques, -j devenant le maximum"
+    )
+    
+    parser.add_argument(
+        "--schedule",
+        choices=SCHEDULE_POLICIES,
+        default="fifo",
+        help="Ordre des conversions en mode batch: découverte (fifo), plus longues d'abord (lpt) "
+             "ou plus courtes d'abord (sjf)"
+    )
+    
+    parser.add_argument(
+        "--group-small",
+        type=int,
+        metavar="K",
+        help=f"En mode batch, convertit les vidéos de moins de {GROUP_MAX_SECONDS} secondes par groupes de K "
+             "avec un seul processus FFmpeg"
+    )
+    
+    parser.add_argument(
+        "-r", "--recursive",
+        action="store_true",
+        help="En mode batch, parcourt aussi les sous-dossiers"
+    )
+    
+    parser.add_argument(
+        "-w", "--watch",
+        action="store_true",
+        help="Surveille le dossier d'entrée et convertit chaque nouvelle vidéo dès son arrivée"
+    )
+    
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="En mode batch, ne reconvertit que les fichiers absents ou périmés"
+    )
+    
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="En mode batch, reprend un lot interrompu d'après son journal"
+    )
+    
+    parser.add_argument(
+        "--progress",
+        type=float,
+        nargs="?",
+        const=5.0,
+        metavar="SECONDES",
+        help="Affiche l'avancement, la vitesse et le temps restant toutes les SECONDES secondes (5 par défaut)"
+    )
+    
+    parser.add_argument(
+        "--metrics-json",
+        metavar="FICHIER",
+        help="Enregistre la durée de chaque étape et les compteurs de l'exécution dans un rapport JSON"
+    )
+    
+    parser.add_argument(
+        "--metrics-prom",
+        metavar="FICHIER",
+        help="Enregistre les mêmes métriques au format texte de Prometheus (collecteur textfile de node_exporter)"
+    )
+    
+    parser.add_argument(
+        "--trace",
+        metavar="FICHIER",
+        help="Enregistre la chronologie des conversions et de leurs étapes au format Chrome trace (Perfetto)"
+    )
+    
+    parser.add_argument(
+        "--no-probe-cache",
+        action="store_true",
+        help="N'utilise pas le cache des analyses FFprobe"
+    )
+    
     parser.add_argument(
         "-v", "--verbose", 
         action="store_true", 
@@ -210,51 +3759,151 @@ def parse_arguments():
 
 def main():
     """Fonction principale du programme."""
-    # Vérifier si FFmpeg est installé
-    if not check_ffmpeg():
-        sys.exit(1)
-    
     # Lire les arguments
     args = parse_arguments()
     
+    if args.jobs < 1:
+        logger.error(f"Le nombre de conversions simultanées doit être au moins 1: {args.jobs}")
+        sys.exit(1)
+    
+    if args.group_small is not None and args.group_small < 2:
+        logger.error(f"Un groupe compte au moins 2 vidéos: {args.group_small}")
+        sys.exit(1)
+    
+    if args.segments is not None and (args.segments < 0 or args.batch or args.watch):
+        logger.error("--segments s'utilise avec un seul fichier et un nombre de plages positif")
+        sys.exit(1)
+    
     # Configurer le niveau de log en fonction du mode verbeux
     if args.verbose:
         logger.setLevel(logging.DEBUG)
     
+    if args.no_probe_cache:
+        configure_probe_cache(enabled=False)
+    
+    # Un filtre de pistes implique l'extraction piste par piste
+    tracks = None
+    if args.all_tracks or args.track_language or args.track_index is not None:
+        tracks = TrackSelection(
+            frozenset(args.track_language) if args.track_language else None,
+            frozenset(args.track_index) if args.track_index is not None else None
+        )
+    
+    # Vérifier FFmpeg seulement maintenant: --help et les erreurs d'arguments n'en ont pas besoin
+    audio_formats = [audio_format for audio_format, _ in args.renditions] if args.renditions else [args.format]
+    if not check_ffmpeg(audio_formats):
+        sys.exit(1)
+    
     # Exécuter la conversion
-    if args.batch:
-        if not os.path.isdir(args.input):
-            logger.error(f"Le chemin d'entrée doit être un dossier en mode batch: {args.input}")
+    if STDIO_PATH in (args.input, args.output):
+        if args.batch or args.watch or args.renditions or tracks is not None or args.segments is not None:
+            logger.error("L'entrée ou la sortie standard (-) ne s'utilise qu'avec un seul fichier et une seule sortie")
             sys.exit(1)
         
-        success, failure = batch_convert(
-            args.input, 
-            args.output, 
-            args.format,
-            args.quality,
-            args.verbose
-        )
-        
-        # Afficher un résumé
-        logger.info(f"Résumé: {success} fichiers convertis avec succès, {failure} échecs")
-        if failure > 0:
+        source = sys.stdin.buffer.raw if args.input == STDIO_PATH else args.input
+        destination = sys.stdout.buffer if args.output == STDIO_PATH else args.output
+        if not convert_stream(source, destination, args.format, args.quality, args.verbose):
             sys.exit(1)
-    else:
-        # Conversion d'un seul fichier
-        if not os.path.isfile(args.input):
-            logger.error(f"Le fichier d'entrée n'existe pas: {args.input}")
+        
+        logger.info("Conversion terminée avec succès!")
+        return
+    
+    if args.watch:
+        if not os.path.isdir(args.input):
+            logger.error(f"Le chemin d'entrée doit être un dossier en mode surveillance: {args.input}")
             sys.exit(1)
         
-        success = convert_video_to_audio(
-            args.input, 
-            args.output, 
+        watch_folder(
+            args.input,
+            args.output,
             args.format,
             args.quality,
-            args.verbose
+            args.verbose,
+            args.jobs,
+            args.recursive,
+            renditions=args.renditions,
+            tracks=tracks
         )
-        
-        if not success:
-            sys.exit(1)
+        return
+    
+    metrics = None
+    if args.metrics_json or args.metrics_prom or args.trace:
+        metrics = RunMetrics(TraceRecorder() if args.trace else None)
+    try:
+        if args.batch:
+            if not os.path.isdir(args.input):
+                logger.error(f"Le chemin d'entrée doit être un dossier en mode batch: {args.input}")
+                sys.exit(1)
+            
+            success, failure = batch_convert(
+                args.input, 
+                args.output, 
+                args.format,
+                args.quality,
+                args.verbose,
+                args.jobs,
+                args.incremental,
+                args.resume,
+                args.recursive,
+                args.renditions,
+                tracks,
+                args.progress,
+                metrics=metrics,
+                schedule=args.schedule,
+                group_small=args.group_small,
+                adaptive_jobs=args.adaptive_jobs
+            )
+            
+            # Afficher un résumé
+            logger.info(f"Résumé: {success} fichiers convertis avec succès, {failure} échecs")
+            if failure > 0:
+                sys.exit(1)
+        else:
+            # Conversion d'un seul fichier
+            if not os.path.isfile(args.input):
+                logger.error(f"Le fichier d'entrée n'existe pas: {args.input}")
+                sys.exit(1)
+            
+            if args.segments is not None:
+                if args.renditions or tracks is not None:
+                    logger.error("--segments produit une seule sortie: il ne se combine pas avec --rendition ni --all-tracks")
+                    sys.exit(1)
+                success = convert_segmented(
+                    args.input,
+                    args.output,
+                    args.format,
+                    args.quality,
+                    args.segments or None,
+                    args.verbose,
+                    metrics=metrics
+                )
+            elif args.renditions or tracks is not None:
+                renditions = args.renditions or [(args.format, args.quality)]
+                outputs = plan_outputs(args.input, os.path.splitext(args.output)[0], renditions, tracks=tracks)
+                success = convert_video_to_renditions(
+                    args.input, outputs, args.verbose,
+                    on_progress=progress_reporter(args.input, args.progress) if args.progress else None,
+                    metrics=metrics
+                )
+            else:
+                success = convert_video_to_audio(
+                    args.input, 
+                    args.output, 
+                    args.format,
+                    args.quality,
+                    args.verbose,
+                    on_progress=progress_reporter(args.input, args.progress) if args.progress else None,
+                    metrics=metrics
+                )
+            
+            if not success:
+                sys.exit(1)
+    finally:
+        # Les métriques d'une exécution en échec sont aussi utiles
+        if metrics is not None:
+            metrics.write(args.metrics_json, args.metrics_prom)
+            if metrics.trace is not None:
+                metrics.trace.write(args.trace)
     
     logger.info("Conversion terminée avec succès!")
 